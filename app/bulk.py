@@ -0,0 +1,138 @@
+"""
+Set-based bulk writes behind the import endpoints (POST /talents/bulk and
+POST /talentskills/bulk).
+
+Rows are validated one by one so each gets its own outcome, foreign keys
+are checked with one query per referenced table, and the writes are
+INSERT ... ON CONFLICT statements of BULK_BATCH_SIZE rows each.
+"""
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Set, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Table, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", "50000"))
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+
+CREATED, UPDATED, SKIPPED, FAILED = "created", "updated", "skipped", "failed"
+
+
+def chunked(items: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def check_row_count(rows: Sequence) -> None:
+    if len(rows) > BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{len(rows)} rows sent, the limit per request is {BULK_MAX_ROWS}"
+        )
+
+
+def failed(index: int, error: str, **fields) -> Dict[str, Any]:
+    return {"index": index, "status": FAILED, "error": error, **fields}
+
+
+def validate_rows(rows: Sequence[Dict], schema: Type[BaseModel], results: Dict[int, Dict]) -> List[Tuple[int, BaseModel]]:
+    """Validate each row against schema; invalid rows are recorded as failed in results."""
+    valid = []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, schema.model_validate(row)))
+        except ValidationError as e:
+            error = e.errors()[0]
+            location = ".".join(str(part) for part in error["loc"]) or "row"
+            results[index] = failed(index, f"{location}: {error['msg']}")
+    return valid
+
+
+def existing_keys(db: Session, column, values: Iterable) -> Set:
+    """Which of values exist in column, in one query per BULK_BATCH_SIZE * 10 values."""
+    values = sorted(set(values))
+    found = set()
+    for batch in chunked(values, BULK_BATCH_SIZE * 10):
+        found.update(db.execute(select(column).where(column.in_(batch))).scalars())
+    return found
+
+
+def _insert_statement(table: Table, columns: Sequence[str], key_columns: Sequence[str], upsert: bool, returning: Sequence[str]):
+    statement = pg_insert(table)
+    update_columns = [name for name in columns if name not in key_columns]
+    if upsert and update_columns:
+        statement = statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={name: statement.excluded[name] for name in update_columns}
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=key_columns)
+    # xmax is 0 only on a row version this statement inserted; an updated row carries our transaction id
+    return statement.returning(
+        *(table.c[name] for name in (*key_columns, *returning)),
+        literal_column("xmax = 0").label("inserted")
+    )
+
+
+def write_rows(
+    db: Session,
+    table: Table,
+    rows: List[Tuple[int, Dict]],
+    key_columns: Sequence[str],
+    upsert: bool,
+    returning: Sequence[str] = ()
+) -> Dict[int, Dict[str, Any]]:
+    """
+    INSERT ... ON CONFLICT (key_columns) the (index, row) pairs.
+
+    Conflicting rows are updated when upsert is set and skipped otherwise.
+    An update only overwrites the columns present in the row dict, so pass
+    model_dump(exclude_unset=True) to leave omitted fields alone; rows with
+    different column sets go in separate statements. Returns an outcome per
+    index carrying the key and returning columns. Keys must be unique within
+    rows. Each batch runs in a savepoint; a batch the database rejects (a
+    value too long for its column, say) is retried row by row so only the
+    offending rows fail.
+    """
+    outcomes: Dict[int, Dict[str, Any]] = {}
+    groups: Dict[Tuple[str, ...], List[Tuple[int, Dict]]] = {}
+    for index, row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append((index, row))
+
+    def execute(statement, batch: Sequence[Tuple[int, Dict]]) -> None:
+        index_by_key = {tuple(row[name] for name in key_columns): index for index, row in batch}
+        with db.begin_nested():
+            written = db.execute(statement, [row for _, row in batch]).mappings().all()
+        for record in written:
+            index = index_by_key[tuple(record[name] for name in key_columns)]
+            fields = {name: record[name] for name in (*key_columns, *returning)}
+            outcomes[index] = {"index": index, "status": CREATED if record["inserted"] else UPDATED, **fields}
+        for index, row in batch:
+            if index not in outcomes:
+                outcomes[index] = {"index": index, "status": SKIPPED, **{name: row[name] for name in key_columns}}
+
+    for columns, group in groups.items():
+        statement = _insert_statement(table, columns, key_columns, upsert, returning)
+        for batch in chunked(group, BULK_BATCH_SIZE):
+            try:
+                execute(statement, batch)
+            except DBAPIError:
+                for index, row in batch:
+                    try:
+                        execute(statement, [(index, row)])
+                    except DBAPIError as e:
+                        message = str(e.orig).strip().splitlines()[0] if e.orig else str(e)
+                        outcomes[index] = failed(index, message, **{name: row[name] for name in key_columns})
+    return outcomes
+
+
+def bulk_response(results: Dict[int, Dict]) -> Dict[str, Any]:
+    ordered = [results[index] for index in sorted(results)]
+    counts = {status: 0 for status in (CREATED, UPDATED, SKIPPED, FAILED)}
+    for result in ordered:
+        counts[result["status"]] += 1
+    return {**counts, "results": ordered}
@@ -0,0 +1,199 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class LRUCache:
+    """Thread-safe in-memory mapping that evicts the least recently used entry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteStore:
+    """Persistent key/blob store backed by a single SQLite file, shared by every worker on the host."""
+
+    def __init__(self, path: str, table: str = "entries"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.table = table
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM {self.table} WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                )
+                found.update(rows)
+        return found
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def set_many(self, items: Dict[str, bytes]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)",
+                items.items()
+            )
+            self._conn.commit()
+
+    def set(self, key: str, value: bytes) -> None:
+        self.set_many({key: value})
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_stores: Dict[tuple, SqliteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: str, table: str = "entries") -> SqliteStore:
+    """Return the process-wide store for a file and table, opening it on first use."""
+    with _stores_lock:
+        if (path, table) not in _stores:
+            _stores[(path, table)] = SqliteStore(path, table)
+        return _stores[(path, table)]
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalise and collapse whitespace so trivially different extractions share a key."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class ResponseCache:
+    """
+    Bounded TTL cache for generated answers, keyed by normalised request text and corpus version.
+
+    An entry only matches while the corpus version it was stored under is
+    current, so bumping the version after ingestion invalidates every answer
+    built from the old collection. With a similarity_threshold, a request whose
+    query embedding has at least that cosine similarity to a cached request's
+    is served the cached answer too.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, similarity_threshold: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, version) -> str:
+        payload = f"{version}\0{normalize_text(text).casefold()}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, text: str, version, embedding: Optional[List[float]] = None):
+        key = self.key(text, version)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry["value"]
+
+            if embedding is not None and self.similarity_threshold is not None:
+                query = _unit_vector(embedding)
+                best_key, best_score = None, self.similarity_threshold
+                for candidate_key, candidate in self._entries.items():
+                    if candidate["version"] != version or candidate["embedding"] is None:
+                        continue
+                    score = float(query @ candidate["embedding"])
+                    if score >= best_score:
+                        best_key, best_score = candidate_key, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.similar_hits += 1
+                    return self._entries[best_key]["value"]
+
+            self.misses += 1
+            return None
+
+    def set(self, text: str, version, value, embedding: Optional[List[float]] = None) -> None:
+        key = self.key(text, version)
+        with self._lock:
+            self._entries[key] = {
+                "version": version,
+                "embedding": _unit_vector(embedding) if embedding is not None else None,
+                "expires_at": time.monotonic() + self.ttl,
+                "value": value
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "entries": len(self._entries)
+            }
+
+    def _evict_expired(self, now: float) -> None:
+        expired = [key for key, entry in self._entries.items() if entry["expires_at"] <= now]
+        for key in expired:
+            del self._entries[key]
+
+
+def _unit_vector(vector: List[float]) -> "np.ndarray":
+    import numpy as np
+
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
@@ -0,0 +1,151 @@
+"""
+Structure-aware splitting of resume text into retrieval chunks.
+
+Like pdf_extraction, this has no dependencies beyond the standard library so
+it can run inside the PDF worker processes.
+"""
+import os
+import re
+from typing import Iterator, List, Tuple
+
+CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "500"))
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "100"))
+# Stored in the ingestion manifest; bump it when chunking output changes so
+# incremental re-indexing re-chunks files whose bytes have not changed
+CHUNKER_VERSION = f"structured-1:{CHUNK_SIZE}:{CHUNK_OVERLAP}"
+
+SECTION_HEADINGS = {
+    "summary", "profile", "professional summary", "about me", "objective",
+    "experience", "work experience", "professional experience", "employment history",
+    "education", "skills", "technical skills", "soft skills", "languages",
+    "projects", "certifications", "certificates", "achievements", "awards",
+    "activities", "interests", "references", "contact", "publications"
+}
+
+_bullet = re.compile(r"^(?:[•●▪◦‣∙·*\-–]|\d{1,2}[.)])\s+")
+_sentence_end = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\"'])")
+
+
+def is_heading(line: str) -> bool:
+    if len(line) > 60 or _bullet.match(line):
+        return False
+    name = line.rstrip(":").strip().lower()
+    if name in SECTION_HEADINGS:
+        return True
+    letters = [c for c in line if c.isalpha()]
+    return len(letters) >= 4 and all(c.isupper() for c in letters)
+
+
+def _units(text: str) -> Iterator[Tuple[str, str, bool]]:
+    """
+    Yield (text, separator, is_heading) for each heading, bullet or sentence.
+
+    Wrapped lines are joined back into their bullet or paragraph before
+    sentence splitting; the separator is what goes between a unit and the
+    one before it in a chunk.
+    """
+    block: List[str] = []
+
+    def flush():
+        if not block:
+            return
+        sentences = _sentence_end.split(" ".join(block))
+        block.clear()
+        for i, sentence in enumerate(sentences):
+            yield sentence, " " if i else "\n", False
+
+    for raw in text.splitlines():
+        line = " ".join(raw.split())
+        if not line:
+            yield from flush()
+            continue
+        if is_heading(line):
+            yield from flush()
+            yield line, "\n", True
+        elif _bullet.match(line):
+            yield from flush()
+            block.append(line)
+        else:
+            block.append(line)
+    yield from flush()
+
+
+def _split_long(unit: str, size: int) -> Iterator[str]:
+    """Break a unit longer than size at word boundaries (hard-cutting only single over-long words)."""
+    piece = ""
+    for word in unit.split(" "):
+        while len(word) > size:
+            if piece:
+                yield piece
+                piece = ""
+            yield word[:size]
+            word = word[size:]
+        if piece and len(piece) + 1 + len(word) > size:
+            yield piece
+            piece = word
+        else:
+            piece = f"{piece} {word}" if piece else word
+    if piece:
+        yield piece
+
+
+def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    Split text into chunks of about chunk_size characters in one pass.
+
+    Chunks end on heading, bullet or sentence boundaries and never mid-word.
+    A new section starts a new chunk once the current one is at least a
+    quarter full (smaller sections are merged), and a chunk continuing a
+    section repeats its heading. Consecutive chunks in a section share up to
+    overlap characters of whole trailing sentences or bullets.
+    """
+    chunks: List[str] = []
+    current: List[Tuple[str, str, bool]] = []
+    length = 0
+    heading = None
+
+    def emit():
+        nonlocal current, length
+        if current and any(not is_head for _, _, is_head in current):
+            chunks.append("".join((sep if i else "") + unit for i, (unit, sep, _) in enumerate(current)))
+        current, length = [], 0
+
+    def continue_section(incoming: int):
+        """Emit the current chunk; start the next with the section heading and trailing overlap."""
+        nonlocal current, length
+        previous = current
+        emit()
+        if heading is not None and len(heading) + incoming <= chunk_size:
+            current.append((heading, "\n", True))
+            length = len(heading) + 1
+        room = min(overlap, chunk_size - length - incoming)
+        carried = []
+        for unit, sep, is_head in reversed(previous):
+            if is_head or len(sep) + len(unit) > room:
+                break
+            carried.append((unit, sep, False))
+            room -= len(sep) + len(unit)
+        for unit, sep, is_head in reversed(carried):
+            current.append((unit, sep, is_head))
+            length += len(sep) + len(unit)
+
+    for unit, sep, is_head in _units(text):
+        if is_head:
+            if length >= chunk_size // 4 or length + len(sep) + len(unit) > chunk_size:
+                emit()
+            heading = unit
+            current.append((unit, sep, True))
+            length += len(sep) + len(unit)
+            continue
+
+        pieces = [unit] if len(unit) <= chunk_size else list(_split_long(unit, chunk_size))
+        for i, piece in enumerate(pieces):
+            piece_sep = sep if i == 0 else " "
+            incoming = len(piece_sep) + len(piece)
+            if current and length + incoming > chunk_size:
+                continue_section(incoming)
+            current.append((piece, piece_sep, False))
+            length += incoming
+
+    emit()
+    return chunks
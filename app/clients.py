@@ -0,0 +1,86 @@
+import os
+import threading
+from typing import Any, Callable, Dict
+
+
+class ClientRegistry:
+    """
+    Process-wide home for expensive clients (Mongo, Gemini, embeddings).
+
+    Each client is built on first use and then shared by every router in the
+    process, so a worker holds one Mongo connection pool however many routers
+    use it. Tests can install stand-ins with override() before the first use.
+    close() is called from the app lifespan on shutdown.
+    """
+
+    def __init__(self):
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+        return instance
+
+    def override(self, name: str, instance: Any) -> None:
+        with self._lock:
+            self._instances[name] = instance
+
+    def close(self) -> None:
+        with self._lock:
+            instances = list(self._instances.values())
+            self._instances.clear()
+        for instance in instances:
+            # Look on the type: pymongo Database/Collection turn unknown attributes into sub-collections
+            close = getattr(type(instance), "close", None)
+            if callable(close):
+                try:
+                    close(instance)
+                except Exception as e:
+                    print(f"Error closing {type(instance).__name__}: {e}")
+
+    def mongo(self):
+        return self.get("mongo", _create_mongo_client)
+
+    def llm(self):
+        return self.get("llm", _create_llm)
+
+    def embeddings(self):
+        return self.get("embeddings", _create_embeddings)
+
+
+def _create_mongo_client():
+    import certifi
+    from pymongo import MongoClient
+
+    return MongoClient(
+        os.getenv("MONGODB_ATLAS_CLUSTER_URI"),
+        tlsCAFile=certifi.where()
+    )
+
+
+def _create_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model="gemini-1.5-flash",
+        temperature=0.7
+    )
+
+
+def _create_embeddings():
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    from .embedding_cache import CachedEmbeddings
+
+    return CachedEmbeddings(GoogleGenerativeAIEmbeddings(
+        model="models/embedding-001",
+        google_api_key=os.getenv("GOOGLE_API_KEY")
+    ))
+
+
+clients = ClientRegistry()
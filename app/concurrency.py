@@ -0,0 +1,26 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads reserved for slow AI work (Gemini, embeddings, Mongo retrieval). Kept apart from
+# the threadpool FastAPI runs sync endpoints on, so in-flight AI requests cannot starve CRUD.
+AI_EXECUTOR_WORKERS = int(os.getenv("AI_EXECUTOR_WORKERS", "8"))
+
+_ai_executor = ThreadPoolExecutor(max_workers=AI_EXECUTOR_WORKERS, thread_name_prefix="ai-call")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Await a blocking call on the bounded AI executor instead of running it on the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_ai_executor, functools.partial(func, *args, **kwargs))
+
+
+async def iterate_blocking(iterator):
+    """Consume a blocking iterator (e.g. llm.stream) on the AI executor, one item at a time."""
+    done = object()
+    while True:
+        item = await run_blocking(next, iterator, done)
+        if item is done:
+            return
+        yield item
@@ -0,0 +1,104 @@
+import os
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+# Budget for the retrieved-candidates part of a prompt, on top of the system prompt and question
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+# Gemini averages roughly four characters of English per token; close enough to budget with
+# and avoids a count_tokens round trip per request
+CHARS_PER_TOKEN = 4
+# Don't bother including a truncated chunk smaller than this
+MIN_PARTIAL_TOKENS = 64
+# Lines longer than this are content, not running headers or footers
+MAX_HEADER_LENGTH = 120
+
+_spaces = re.compile(r"[^\S\n]+")
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def clean_lines(text: str) -> List[str]:
+    """Collapse runs of spaces and drop blank lines left behind by PDF extraction."""
+    lines = (_spaces.sub(" ", line).strip() for line in text.splitlines())
+    return [line for line in lines if line]
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    limit = max_tokens * CHARS_PER_TOKEN
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut if cut > 0 else limit]
+
+
+def build_context(
+    documents: List[Dict],
+    label: Callable[[Dict], str],
+    budget: int = CONTEXT_TOKEN_BUDGET
+) -> Tuple[str, List[Dict], Dict[str, int]]:
+    """
+    Assemble prompt context from retrieved chunks within a token budget.
+
+    documents must be ordered best first, as the retrievers return them.
+    Whitespace is normalised, lines repeated across chunks of the same file
+    (page headers and footers) are kept only once, and duplicate chunks are
+    dropped. Chunks are then added in rank order until the budget runs out,
+    so the lowest-scoring ones are the first to go; the chunk that crosses
+    the budget is cut at a line boundary if enough room is left.
+
+    Returns the context text, the documents actually used and token usage
+    for the response metadata.
+    """
+    cleaned = [clean_lines(doc["text"]) for doc in documents]
+
+    # A short line seen in more than one chunk of a file is a running header or footer
+    per_file = Counter()
+    for doc, lines in zip(documents, cleaned):
+        file_name = doc["metadata"]["file_name"]
+        per_file.update((file_name, line) for line in set(lines) if len(line) <= MAX_HEADER_LENGTH)
+    repeated = {key for key, count in per_file.items() if count > 1}
+
+    seen_headers = set()
+    seen_chunks = set()
+    sections, used = [], []
+    tokens_used = 0
+    duplicates = 0
+    for doc, lines in zip(documents, cleaned):
+        file_name = doc["metadata"]["file_name"]
+        kept = []
+        for line in lines:
+            if (file_name, line) in repeated:
+                if (file_name, line) in seen_headers:
+                    continue
+                seen_headers.add((file_name, line))
+            kept.append(line)
+        text = "\n".join(kept)
+        if not text or text in seen_chunks:
+            duplicates += 1
+            continue
+        seen_chunks.add(text)
+
+        section = f"{label(doc)}\n{text}\n\n"
+        cost = estimate_tokens(section)
+        remaining = budget - tokens_used
+        if cost > remaining:
+            header_cost = estimate_tokens(f"{label(doc)}\n\n\n")
+            if remaining - header_cost >= MIN_PARTIAL_TOKENS:
+                section = f"{label(doc)}\n{_truncate(text, remaining - header_cost)}\n\n"
+                sections.append(section)
+                used.append(doc)
+                tokens_used += estimate_tokens(section)
+            break
+        sections.append(section)
+        used.append(doc)
+        tokens_used += cost
+
+    usage = {
+        "context_tokens": tokens_used,
+        "token_budget": budget,
+        "chunks_retrieved": len(documents),
+        "chunks_used": len(used),
+        "duplicates_removed": duplicates
+    }
+    return "".join(sections), used, usage
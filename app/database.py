@@ -1,7 +1,12 @@
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 import os
+import threading
+import time
+from .metrics import Histogram
 
 # Load environment variables
 load_dotenv()
@@ -13,15 +18,162 @@ DB_NAME = os.getenv("DB_NAME")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 
-# Construct database URL
+# Construct database URLs; the async engine talks to the same database through asyncpg
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL)
+# Connection pools, per worker process and per engine (the sync and async engines each get one):
+# at most DB_POOL_SIZE + DB_MAX_OVERFLOW connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+# Seconds a request waits for a free connection before getting a 503
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections older than this are replaced on checkout (-1 disables); keeps us under server/LB idle limits
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test each connection on checkout, so connections killed by a failover are replaced instead of failing a request
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Server-side cap on any single statement; 0 leaves the server default
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+# Time spent waiting for a pooled connection (including pre-ping and any new connect), per engine
+pool_wait = Histogram()
+async_pool_wait = Histogram()
+_pool_waits = {"sync": pool_wait, "async": async_pool_wait}
+_pool_timeouts = {"sync": 0, "async": 0}
+_pool_timeouts_lock = threading.Lock()
+
+
+class _TimedCheckout:
+    """Pool mixin recording every checkout's wait and counting checkout timeouts"""
+    kind = "sync"
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            with _pool_timeouts_lock:
+                _pool_timeouts[self.kind] += 1
+            raise
+        finally:
+            _pool_waits[self.kind].observe(time.perf_counter() - started)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    kind = "sync"
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    kind = "async"
+
+
+connect_args = {}
+if DB_STATEMENT_TIMEOUT_MS > 0:
+    connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=TimedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=connect_args,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_async_engine = None
+_async_session_factory = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine():
+    """
+    The asyncpg engine behind get_async_db, created on first use.
+
+    Read-heavy routers use it so a request waiting on Postgres parks on the
+    event loop instead of holding one of FastAPI's threadpool threads.
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+                async_connect_args = {}
+                if DB_STATEMENT_TIMEOUT_MS > 0:
+                    async_connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+                _async_engine = create_async_engine(
+                    ASYNC_DATABASE_URL,
+                    poolclass=TimedAsyncQueuePool,
+                    pool_size=DB_POOL_SIZE,
+                    max_overflow=DB_MAX_OVERFLOW,
+                    pool_timeout=DB_POOL_TIMEOUT,
+                    pool_recycle=DB_POOL_RECYCLE,
+                    pool_pre_ping=DB_POOL_PRE_PING,
+                    connect_args=async_connect_args,
+                )
+                # Results are serialized after the session closes, so keep loaded attributes
+                _async_session_factory = async_sessionmaker(
+                    _async_engine, autoflush=False, expire_on_commit=False
+                )
+    return _async_engine
+
+
+def AsyncSessionLocal():
+    get_async_engine()
+    return _async_session_factory()
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
+
+def _pool_counters(pool, kind: str) -> dict:
+    return {
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # QueuePool counts overflow from -pool_size; only connections beyond pool_size are overflow
+        "overflow": max(pool.overflow(), 0),
+        "checkout_timeouts": _pool_timeouts[kind],
+        "wait_seconds": _pool_waits[kind].snapshot(),
+    }
+
+
+def pool_status() -> dict:
+    """Live pool counters plus the checkout wait histograms, for GET /metrics/db-pool"""
+    status = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pre_ping": DB_POOL_PRE_PING,
+        "statement_timeout_ms": DB_STATEMENT_TIMEOUT_MS,
+        **_pool_counters(engine.pool, "sync"),
+        "async_pool": None,
+    }
+    if _async_engine is not None:
+        status["async_pool"] = _pool_counters(_async_engine.pool, "async")
+    return status
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """Async counterpart of get_db for read endpoints: `await db.execute(select(...))`, no lazy loading"""
+    db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from .cache import LRUCache, SqliteStore, get_store, normalize_text
+
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Content-addressed cache in front of an embeddings model.
+
+    Vectors are keyed by SHA-256 of the model name, the task (query or
+    document, which the Google models embed differently) and the normalised
+    text. Lookups go to a bounded in-memory LRU first, then to a SQLite file
+    that survives restarts; only misses reach the underlying model.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: Optional[str] = None,
+        store: Optional[SqliteStore] = None,
+        max_entries: int = EMBEDDING_CACHE_SIZE
+    ):
+        self.embeddings = embeddings
+        self.model_name = model_name or getattr(embeddings, "model", type(embeddings).__name__)
+        self.store = store if store is not None else get_store(EMBEDDING_CACHE_PATH, "embeddings")
+        self.memory = LRUCache(max_entries)
+        self._stats_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.embedding_calls = 0
+
+    def key(self, text: str, task: str) -> str:
+        payload = f"{self.model_name}\0{task}\0{normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], "query")[0]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, "document")
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "embedding_calls": self.embedding_calls,
+                "memory_entries": len(self.memory)
+            }
+
+    def _embed(self, texts: List[str], task: str) -> List[List[float]]:
+        keys = [self.key(text, task) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is not None:
+                vectors[key] = vector
+        memory_hits = len(vectors)
+
+        pending = [key for key in dict.fromkeys(keys) if key not in vectors]
+        for key, blob in self.store.get_many(pending).items():
+            vector = array("d", blob).tolist()
+            vectors[key] = vector
+            self.memory.set(key, vector)
+        disk_hits = len(vectors) - memory_hits
+
+        # Embed each distinct missing text once, even if repeated within the batch
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        if missing:
+            if task == "query":
+                embedded = [self.embeddings.embed_query(text) for text in missing.values()]
+            else:
+                embedded = self.embeddings.embed_documents(list(missing.values()))
+            for key, vector in zip(missing, embedded):
+                vectors[key] = vector
+                self.memory.set(key, vector)
+            self.store.set_many({key: array("d", vectors[key]).tobytes() for key in missing})
+
+        with self._stats_lock:
+            self.memory_hits += memory_hits
+            self.disk_hits += disk_hits
+            self.misses += len(missing)
+            self.embedding_calls += len(missing) if task == "query" else int(bool(missing))
+
+        return [vectors[key] for key in keys]
@@ -0,0 +1,428 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+PDF_EXTRACT_TIMEOUT = float(os.getenv("PDF_EXTRACT_TIMEOUT", "60"))
+
+
+def _document_failure(doc: Dict, error) -> Dict[str, str]:
+    page = doc.get("page_number", doc["metadata"].get("page_number"))
+    return {
+        "filename": doc["metadata"]["file_name"],
+        "page": str(page),
+        "error": str(error)
+    }
+
+
+class BatchWriter:
+    """
+    Buffer resume chunks and store them a batch at a time.
+
+    Each full batch costs one embed_documents call and one unordered
+    insert_many, instead of an embedding call and insert_one per chunk.
+    Chunks that fail to embed or insert are collected in `failures` rather
+    than aborting the run.
+    """
+
+    def __init__(self, collection, embeddings, batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.collection = collection
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.pending: List[Dict] = []
+        self.inserted = 0
+        self.failures: List[Dict[str, str]] = []
+
+    def add(self, documents: List[Dict]) -> None:
+        self.pending.extend(documents)
+        while len(self.pending) >= self.batch_size:
+            batch = self.pending[:self.batch_size]
+            del self.pending[:self.batch_size]
+            self._write(batch)
+
+    def flush(self) -> None:
+        if self.pending:
+            batch = self.pending
+            self.pending = []
+            self._write(batch)
+
+    def _write(self, batch: List[Dict]) -> None:
+        from pymongo.errors import BulkWriteError
+
+        try:
+            vectors = self.embeddings.embed_documents([doc["text"] for doc in batch])
+        except Exception as e:
+            print(f"Error embedding batch of {len(batch)} chunks: {str(e)}")
+            self.failures.extend(_document_failure(doc, e) for doc in batch)
+            return
+
+        mongo_docs = [dict(doc, embedding_array=vector) for doc, vector in zip(batch, vectors)]
+        try:
+            result = self.collection.insert_many(mongo_docs, ordered=False)
+            self.inserted += len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Unordered writes keep going past bad documents; report just those
+            self.inserted += e.details.get("nInserted", 0)
+            for error in e.details.get("writeErrors", []):
+                self.failures.append(_document_failure(mongo_docs[error["index"]], error.get("errmsg")))
+        except Exception as e:
+            print(f"Error inserting batch of {len(batch)} chunks: {str(e)}")
+            self.failures.extend(_document_failure(doc, e) for doc in mongo_docs)
+
+
+def create_resume_indexes(collection) -> None:
+    """Indexes the loaders and hybrid retrieval rely on; created by app.migrations."""
+    from pymongo import ASCENDING, TEXT
+
+    collection.create_index([("text", TEXT)])
+    collection.create_index([("metadata.file_name", ASCENDING)])
+
+
+def file_sha256(path: str, salt: str = "") -> str:
+    digest = hashlib.sha256(salt.encode("utf-8"))
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """Per-file record of what a resume collection was built from (content hash, mtime, size, chunk count, pipeline version)."""
+
+    def __init__(self, collection):
+        self.collection_name = collection.name
+        self.manifest = collection.database["ingestion_manifest"]
+
+    def create_indexes(self) -> None:
+        from pymongo import ASCENDING
+
+        self.manifest.create_index([("collection", ASCENDING), ("file_name", ASCENDING)], unique=True)
+
+    def entries(self) -> Dict[str, Dict]:
+        return {
+            entry["file_name"]: entry
+            for entry in self.manifest.find({"collection": self.collection_name})
+        }
+
+    def record(self, file_name: str, content_hash: str, stat: os.stat_result, chunk_count: int,
+               pipeline_version: str = "") -> None:
+        self.manifest.update_one(
+            {"collection": self.collection_name, "file_name": file_name},
+            {"$set": {
+                "content_hash": content_hash,
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "chunk_count": chunk_count,
+                "pipeline_version": pipeline_version,
+                "indexed_at": datetime.utcnow()
+            }},
+            upsert=True
+        )
+
+    def remove(self, file_name: str) -> None:
+        self.manifest.delete_one({"collection": self.collection_name, "file_name": file_name})
+
+    def clear(self) -> None:
+        self.manifest.delete_many({"collection": self.collection_name})
+
+
+def corpus_version(collection) -> int:
+    """Counter bumped whenever the collection's content changes; answers cached under an older value are stale."""
+    entry = collection.database["corpus_versions"].find_one({"_id": collection.name})
+    return entry["version"] if entry else 0
+
+
+def bump_corpus_version(collection) -> int:
+    from pymongo import ReturnDocument
+
+    entry = collection.database["corpus_versions"].find_one_and_update(
+        {"_id": collection.name},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return entry["version"]
+
+
+def _report_pid(pids) -> None:
+    # Pool initializer: tell the parent which process this worker is, so it can be killed if it hangs
+    pids.put(os.getpid())
+
+
+def _terminate_pool(pool: ProcessPoolExecutor, pids) -> None:
+    # A worker stuck in a pathological PDF never returns on its own. Only live children are
+    # matched, so a PID that has already been reaped and reused is never signalled.
+    reported = set()
+    while not pids.empty():
+        reported.add(pids.get())
+    for process in multiprocessing.active_children():
+        if process.pid in reported:
+            process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ExtractionPool:
+    """
+    Spawned worker processes for PDF parsing, replaced when one hangs.
+
+    extract_files builds one per call unless it is handed a long-lived pool,
+    as the resume batch endpoint does so its requests do not each start
+    workers and re-import the parsing modules. Callers on the same event
+    loop share `workers` slots, so a file's timeout only counts time spent
+    parsing. Workers start on first use; close() shuts them down.
+    """
+
+    def __init__(self, workers: int = PDF_EXTRACT_WORKERS):
+        self.workers = max(1, workers)
+        # Spawned workers only import the extraction code, not the parent's Mongo/gRPC clients
+        self._context = multiprocessing.get_context("spawn")
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pids = None
+        self._lock = threading.Lock()
+        # One semaphore per event loop, since asyncio primitives cannot be shared between loops
+        self._slots = weakref.WeakKeyDictionary()
+
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._pids = self._context.SimpleQueue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=self._context,
+                    initializer=_report_pid,
+                    initargs=(self._pids,)
+                )
+            return self._executor
+
+    def slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.workers)
+        return slots
+
+    def recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Kill the workers of executor and start afresh, unless another caller already did."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor, pids = None, self._pids
+        _terminate_pool(executor, pids)
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def extract_files(
+    paths: Dict[str, str],
+    extract_documents: Callable[[str], List[Dict]],
+    workers: int = PDF_EXTRACT_WORKERS,
+    timeout: float = PDF_EXTRACT_TIMEOUT,
+    pool: Optional[ExtractionPool] = None
+) -> AsyncIterator[Tuple[str, Optional[List[Dict]], Optional[Exception]]]:
+    """
+    Run extract_documents over {filename: path} in a process pool.
+
+    Yields (filename, documents, error) in completion order. At most `workers`
+    files are in flight so the timeout only counts time spent parsing; a file
+    that exceeds it is reported as failed and the pool is replaced, and files
+    that were killed alongside it are retried once on the new pool. Without
+    `pool`, one sized for the call is started and shut down afterwards.
+    """
+    if not paths:
+        return
+
+    loop = asyncio.get_running_loop()
+    owned = pool is None
+    if owned:
+        pool = ExtractionPool(min(workers, len(paths)))
+    slots = pool.slots()
+
+    async def run(filename: str, pdf_path: str):
+        error = None
+        for _ in range(2):
+            async with slots:
+                executor = pool.executor()
+                try:
+                    documents = await asyncio.wait_for(
+                        loop.run_in_executor(executor, extract_documents, pdf_path), timeout
+                    )
+                    return filename, documents, None
+                except asyncio.TimeoutError:
+                    pool.recycle(executor)
+                    return filename, None, TimeoutError(f"Extraction timed out after {timeout:g}s")
+                except BrokenProcessPool as e:
+                    pool.recycle(executor)
+                    error = e
+                except Exception as e:
+                    return filename, None, e
+        return filename, None, error
+
+    try:
+        for completed in asyncio.as_completed([run(f, p) for f, p in paths.items()]):
+            yield await completed
+    finally:
+        if owned:
+            pool.close()
+
+
+def _plan_reindex(folder: str, manifest: IngestionManifest, report: Dict,
+                  pipeline_version: str = "") -> Tuple[Dict, Dict, Dict]:
+    """Sort the folder into unchanged files and files that need (re)indexing."""
+    known = manifest.entries()
+    on_disk = {
+        filename: os.path.join(folder, filename)
+        for filename in sorted(os.listdir(folder))
+        if filename.endswith(".pdf")
+    }
+
+    to_index = {}
+    for filename, pdf_path in on_disk.items():
+        stat = os.stat(pdf_path)
+        entry = known.get(filename)
+        # Output of an older extraction/chunking pipeline needs rebuilding even if the file is the same
+        current = entry is not None and entry.get("pipeline_version", "") == pipeline_version
+        if current and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            report["unchanged_files"].append(filename)
+            continue
+
+        # Salting with the pipeline version keeps chunks of the old and new pipeline apart
+        content_hash = file_sha256(pdf_path, pipeline_version)
+        if current and entry["content_hash"] == content_hash:
+            # Touched but not modified
+            manifest.record(filename, content_hash, stat, entry["chunk_count"], pipeline_version)
+            report["unchanged_files"].append(filename)
+            continue
+
+        to_index[filename] = (content_hash, stat, "updated_files" if entry else "added_files")
+    return known, on_disk, to_index
+
+
+def _stage_documents(collection, writer: BatchWriter, filename: str, content_hash: str, documents: List[Dict]) -> None:
+    for doc in documents:
+        doc["metadata"] = dict(doc["metadata"], content_hash=content_hash)
+    # Drop leftovers of an interrupted run for this exact content before re-inserting it
+    collection.delete_many({"metadata.file_name": filename, "metadata.content_hash": content_hash})
+    writer.add(documents)
+
+
+def _finish_reindex(collection, manifest: IngestionManifest, writer: BatchWriter,
+                    known: Dict, on_disk: Dict, processed: Dict, report: Dict,
+                    pipeline_version: str = "") -> None:
+    writer.flush()
+
+    failed_chunk_files = {failure["filename"] for failure in writer.failures}
+    for filename, (content_hash, stat, chunk_count, outcome) in processed.items():
+        if filename in failed_chunk_files:
+            collection.delete_many({"metadata.file_name": filename, "metadata.content_hash": content_hash})
+            report["failed_files"].append({
+                "filename": filename,
+                "error": "Some chunks failed to embed or insert, previous version kept"
+            })
+            continue
+        collection.delete_many({"metadata.file_name": filename, "metadata.content_hash": {"$ne": content_hash}})
+        manifest.record(filename, content_hash, stat, chunk_count, pipeline_version)
+        report[outcome].append(filename)
+
+    for filename in known.keys() - on_disk.keys():
+        manifest.remove(filename)
+        report["removed_files"].append(filename)
+    # Also sweeps chunks of deleted files indexed before the manifest existed
+    collection.delete_many({"metadata.file_name": {"$nin": list(on_disk)}})
+
+
+async def reindex_folder(
+    folder: str,
+    collection,
+    embeddings,
+    extract_documents: Callable[[str], List[Dict]],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    full_rebuild: bool = False,
+    workers: int = PDF_EXTRACT_WORKERS,
+    timeout: float = PDF_EXTRACT_TIMEOUT,
+    progress: Optional[Callable[[Dict], None]] = None,
+    pipeline_version: str = ""
+) -> Dict:
+    """
+    Bring the collection in line with the PDFs in folder, touching only what changed.
+
+    Files whose size and mtime match the manifest are skipped without being
+    read; otherwise the content hash decides. Files indexed under a different
+    pipeline_version (e.g. a changed chunker) are always rebuilt. New versions of a file are
+    inserted before the old chunks are deleted, so retrieval keeps answering
+    throughout. If any chunk of a file fails, its new chunks are dropped, the
+    previous version stays in place and the manifest is left untouched so the
+    next run retries it.
+
+    Parsing runs in a process pool (see extract_files) and each file is
+    embedded as soon as it is parsed; the blocking Mongo and embedding calls
+    run in a thread so the event loop stays free for other requests.
+
+    If given, progress is called with files_total, files_done, pages_embedded
+    and errors after planning and after every file. The corpus version is
+    bumped whenever the run changed the collection.
+    """
+    manifest = IngestionManifest(collection)
+    if full_rebuild:
+        await asyncio.to_thread(collection.delete_many, {})
+        await asyncio.to_thread(manifest.clear)
+
+    report = {
+        "added_files": [],
+        "updated_files": [],
+        "unchanged_files": [],
+        "removed_files": [],
+        "failed_files": []
+    }
+    known, on_disk, to_index = await asyncio.to_thread(_plan_reindex, folder, manifest, report, pipeline_version)
+
+    writer = BatchWriter(collection, embeddings, batch_size)
+    processed = {}
+    files_done = 0
+
+    def report_progress() -> None:
+        if progress is not None:
+            progress({
+                "files_total": len(to_index),
+                "files_done": files_done,
+                "pages_embedded": writer.inserted,
+                "errors": report["failed_files"] + writer.failures
+            })
+
+    report_progress()
+    paths = {filename: on_disk[filename] for filename in to_index}
+    async for filename, documents, error in extract_files(paths, extract_documents, workers, timeout):
+        files_done += 1
+        if error is not None:
+            report["failed_files"].append({"filename": filename, "error": str(error)})
+            print(f"Error processing {filename}: {str(error)}")
+            report_progress()
+            continue
+
+        print(f"Processing {filename}...")
+        content_hash, stat, outcome = to_index[filename]
+        await asyncio.to_thread(_stage_documents, collection, writer, filename, content_hash, documents)
+        processed[filename] = (content_hash, stat, len(documents), outcome)
+        report_progress()
+
+    await asyncio.to_thread(
+        _finish_reindex, collection, manifest, writer, known, on_disk, processed, report, pipeline_version
+    )
+    if full_rebuild or report["added_files"] or report["updated_files"] or report["removed_files"]:
+        await asyncio.to_thread(bump_corpus_version, collection)
+    report_progress()
+
+    report["total_pages_processed"] = writer.inserted
+    report["failed_documents"] = writer.failures
+    return report
@@ -0,0 +1,256 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+INGESTION_JOB_WORKERS = int(os.getenv("INGESTION_JOB_WORKERS", "1"))
+# A queued/running job whose heartbeat stopped this long ago is treated as abandoned
+INGESTION_JOB_STALE_AFTER = int(os.getenv("INGESTION_JOB_STALE_AFTER", "900"))
+# How often the process holding a job refreshes its heartbeat, whether or not it made progress
+INGESTION_JOB_HEARTBEAT = float(os.getenv("INGESTION_JOB_HEARTBEAT", "30"))
+
+ProgressCallback = Callable[[Dict], None]
+
+_executor = ThreadPoolExecutor(max_workers=INGESTION_JOB_WORKERS, thread_name_prefix="ingestion-job")
+
+
+class JobAlreadyRunning(Exception):
+    def __init__(self, job: Dict):
+        super().__init__(f"Job {job['job_id']} is already {job['status']}")
+        self.job = job
+
+
+class JobExpired(Exception):
+    """Raised inside a job whose record was expired, so it stops instead of racing its replacement."""
+
+
+class JobStore:
+    """
+    Ingestion job records kept in MongoDB, so any API worker can report on any job.
+
+    A queued or running job carries active=True until it finishes. A unique
+    partial index on kind over active jobs lets create() claim the single
+    active slot per kind atomically, across API workers.
+
+    The process holding a job refreshes heartbeat_at on a timer from the
+    moment it is queued, so a job waiting for the executor or stuck on one
+    slow file keeps its slot; only a job whose process stopped beating is
+    expired. Writes after the job starts are conditional on active=True, so
+    an expired job can never overwrite the record's final state.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def create_indexes(self) -> None:
+        from pymongo import ASCENDING, DESCENDING
+
+        self.collection.create_index([("kind", ASCENDING), ("submitted_at", DESCENDING)])
+        self.collection.create_index(
+            [("kind", ASCENDING)],
+            name="one_active_job_per_kind",
+            unique=True,
+            partialFilterExpression={"active": True}
+        )
+
+    def create(self, kind: str, params: Dict) -> Dict:
+        """Record a queued job, or raise JobAlreadyRunning if this kind already has an active one."""
+        from pymongo.errors import DuplicateKeyError
+
+        self._expire_stale(kind)
+        now = datetime.utcnow()
+        job = {
+            "_id": uuid.uuid4().hex,
+            "kind": kind,
+            "params": params,
+            "status": "queued",
+            "active": True,
+            "submitted_at": now,
+            "updated_at": now,
+            "heartbeat_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "files_total": 0,
+            "files_done": 0,
+            "pages_embedded": 0,
+            "pages_per_second": 0.0,
+            "errors": [],
+            "result": None
+        }
+        # A duplicate key means another job holds the slot; if it finished meanwhile, claim it again
+        for _ in range(3):
+            try:
+                self.collection.insert_one(job)
+                return self._public(job)
+            except DuplicateKeyError:
+                active = self.active(kind)
+                if active is not None:
+                    raise JobAlreadyRunning(active)
+        raise JobAlreadyRunning(self.active(kind) or self._public(job))
+
+    def _expire_stale(self, kind: str) -> None:
+        """Release the slot held by a job whose heartbeat stopped (e.g. its worker died)."""
+        self.collection.update_many(
+            {
+                "kind": kind,
+                "active": True,
+                "heartbeat_at": {"$lte": datetime.utcnow() - timedelta(seconds=INGESTION_JOB_STALE_AFTER)}
+            },
+            {
+                "$set": {"status": "failed", "active": False, "finished_at": datetime.utcnow()},
+                "$push": {"errors": {"filename": "", "error": f"No heartbeat for {INGESTION_JOB_STALE_AFTER}s; abandoned"}}
+            }
+        )
+
+    def update(self, job_id: str, **fields) -> bool:
+        """Update a job that still holds its slot; False if it has finished or been expired."""
+        fields["updated_at"] = datetime.utcnow()
+        return self.collection.update_one({"_id": job_id, "active": True}, {"$set": fields}).matched_count == 1
+
+    def heartbeat(self, job_id: str) -> bool:
+        return self.collection.update_one(
+            {"_id": job_id, "active": True},
+            {"$set": {"heartbeat_at": datetime.utcnow()}}
+        ).matched_count == 1
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self._public(self.collection.find_one({"_id": job_id}))
+
+    def list(self, kind: str, limit: int = 20) -> List[Dict]:
+        from pymongo import DESCENDING
+
+        jobs = self.collection.find({"kind": kind}).sort("submitted_at", DESCENDING).limit(limit)
+        return [self._public(job) for job in jobs]
+
+    def active(self, kind: str) -> Optional[Dict]:
+        return self._public(self.collection.find_one({"kind": kind, "active": True}))
+
+    @staticmethod
+    def _public(job: Optional[Dict]) -> Optional[Dict]:
+        if job is None:
+            return None
+        job = dict(job)
+        job["job_id"] = job.pop("_id")
+        return job
+
+
+def submit_job(
+    store: JobStore,
+    kind: str,
+    run: Callable[[ProgressCallback], Awaitable[Dict]],
+    params: Dict
+) -> Dict:
+    """
+    Record a job and hand it to the background worker, returning immediately.
+
+    `run` is called with a progress callback and executed on its own event
+    loop in the job thread, so a long re-index never occupies a request
+    worker. Only one active job per kind is allowed.
+    """
+    job, _ = _submit(store, kind, run, params)
+    return job
+
+
+async def run_job(
+    store: JobStore,
+    kind: str,
+    run: Callable[[ProgressCallback], Awaitable[Dict]],
+    params: Dict
+) -> Dict:
+    """
+    Like submit_job, but wait for the job to finish and return its result.
+
+    For endpoints that answer within the request: the work still goes
+    through the one-active-job guard and the job worker, and is recorded
+    like any other job.
+    """
+    _, future = await asyncio.to_thread(_submit, store, kind, run, params)
+    return await asyncio.wrap_future(future)
+
+
+class _Heartbeat:
+    """Refresh a job's heartbeat_at until stopped; notes when the record was expired under it."""
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self.expired = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"job-heartbeat-{job_id[:8]}", daemon=True)
+        self._thread.start()
+
+    def _beat(self) -> None:
+        while not self._stop.wait(INGESTION_JOB_HEARTBEAT):
+            try:
+                alive = self.store.heartbeat(self.job_id)
+            except Exception as e:
+                # A missed beat is harmless unless Mongo stays unreachable for INGESTION_JOB_STALE_AFTER
+                print(f"Heartbeat for ingestion job {self.job_id} failed: {str(e)}")
+                continue
+            if not alive:
+                self.expired.set()
+                return
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def _submit(store: JobStore, kind: str, run: Callable[[ProgressCallback], Awaitable[Dict]], params: Dict) -> Tuple[Dict, Future]:
+    job = store.create(kind, params)
+    heartbeat = _Heartbeat(store, job["job_id"])
+    try:
+        return job, _executor.submit(_run_job, store, job["job_id"], run, heartbeat)
+    except Exception:
+        heartbeat.stop()
+        raise
+
+
+def _run_job(
+    store: JobStore,
+    job_id: str,
+    run: Callable[[ProgressCallback], Awaitable[Dict]],
+    heartbeat: _Heartbeat
+) -> Dict:
+    try:
+        started = time.monotonic()
+        if heartbeat.expired.is_set() or not store.update(job_id, status="running", started_at=datetime.utcnow()):
+            raise JobExpired(f"Ingestion job {job_id} was expired before it started")
+        last = {"errors": []}
+
+        def progress(snapshot: Dict) -> None:
+            # Stop at the next progress point rather than run alongside the job that took the slot
+            if heartbeat.expired.is_set():
+                raise JobExpired(f"Ingestion job {job_id} was expired while running")
+            last.update(snapshot)
+            elapsed = max(time.monotonic() - started, 1e-6)
+            if not store.update(
+                job_id,
+                pages_per_second=round(snapshot.get("pages_embedded", 0) / elapsed, 2),
+                **snapshot
+            ):
+                heartbeat.expired.set()
+                raise JobExpired(f"Ingestion job {job_id} was expired while running")
+
+        try:
+            result = asyncio.run(run(progress))
+        except Exception as e:
+            print(f"Ingestion job {job_id} failed: {str(e)}")
+            # No-op if the job was expired: its record already says failed
+            store.update(
+                job_id,
+                status="failed",
+                active=False,
+                finished_at=datetime.utcnow(),
+                errors=last["errors"] + [{"filename": "", "error": str(e)}]
+            )
+            # Only run_job callers see this; submit_job drops the future
+            raise
+        if not store.update(job_id, status="completed", active=False, finished_at=datetime.utcnow(), result=result):
+            raise JobExpired(f"Ingestion job {job_id} finished after it was expired; its result was not recorded")
+        return result
+    finally:
+        heartbeat.stop()
@@ -1,14 +1,39 @@
-from fastapi import FastAPI
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.formparsers import MultiPartParser
+
+from .clients import clients
+from .database import dispose_async_engine
+from .pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from .uploads import UPLOAD_SPOOL_THRESHOLD
+# Every router module is imported up front on purpose: FastAPI needs all routes registered before
+# serving, for routing and /docs. What made the AI routers slow to import (langchain, the Gemini
+# SDK, pymongo, numpy, the PDF libraries) is loaded on first use inside them instead, so these
+# imports cost about as much as the CRUD routers' (see benchmarks/startup.py).
+from .routers import department, skill, talent, project, user, gemini, pdf_storage, rag, pdf_loader, pdf_loader_omar, chat, projectassignments, talentskill, certification, profileCard, metrics
 
-from .database import engine
-from . import models
-from .routers import department, skill, talent, project, user, gemini, pdf_storage, rag, pdf_loader, pdf_loader_omar, chat, projectassignments, talentskill, certification, profileCard
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables and indexes are normally created by `python -m app.migrations` at deploy time
+    if os.getenv("RUN_MIGRATIONS_ON_STARTUP", "false").lower() == "true":
+        from . import migrations
+        await asyncio.to_thread(migrations.run)
+    yield
+    # Mongo, Gemini and embedding clients are created on first use; release them on shutdown
+    clients.close()
+    await dispose_async_engine()
 
-# Initialize DB tables
-models.Base.metadata.create_all(bind=engine)
+app = FastAPI(lifespan=lifespan)
 
-app = FastAPI()
+# Uploaded file parts larger than this are spooled to disk instead of memory. Starlette only
+# offers this as a class attribute, so it applies to every app in the process, not just this one.
+MultiPartParser.max_file_size = UPLOAD_SPOOL_THRESHOLD
 
 # CORS Configuration
 app.add_middleware(
@@ -17,8 +42,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 
+# Requests that waited DB_POOL_TIMEOUT for a connection get a retryable 503 rather than a 500
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database connection pool exhausted, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 # Include Routers
 app.include_router(department.router)
 app.include_router(skill.router)
@@ -35,6 +70,7 @@ app.include_router(chat.router)
 app.include_router(projectassignments.router)
 app.include_router(talentskill.router)
 app.include_router(profileCard.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def home():
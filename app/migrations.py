@@ -0,0 +1,145 @@
+"""
+Database schema and index setup.
+
+Run once per deploy, before starting the API workers:
+
+    python -m app.migrations
+
+or set RUN_MIGRATIONS_ON_STARTUP=true to have each worker run it from the app
+lifespan. Nothing creates tables or indexes at import time. With
+VECTOR_BACKEND=local it also builds the local vector snapshots that do not
+exist yet; after that, ingestion keeps them current.
+
+Postgres changes to existing tables are versioned: each entry in MIGRATIONS
+runs once, in its own transaction, and is recorded in schema_migrations.
+create_all only creates tables that do not exist yet (with the indexes the
+models declare), so a migration must also be idempotent against a fresh
+database where create_all already did its work. New entries go at the end
+with the next version number; never edit one that has shipped.
+"""
+from typing import Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from . import models
+from .database import engine
+# Not exported by app.models, but their tables must exist too
+from .models import certification, chat  # noqa: F401
+
+RESUME_COLLECTIONS = ("resumes", "resumes_db")
+
+# pg_advisory_lock key held while migrating, so workers started together migrate one at a time
+MIGRATION_LOCK_ID = 4105202201
+
+
+def _hot_path_indexes(connection: Connection) -> None:
+    """Indexes for the join and filter columns the routers use, and one assignment per (project, talent)."""
+    # Keep the oldest of any duplicate assignments so the unique constraint can be added
+    removed = connection.execute(text("""
+        DELETE FROM projectassignments a
+        USING projectassignments b
+        WHERE a.project_id = b.project_id
+          AND a.talent_id = b.talent_id
+          AND a.assignment_id > b.assignment_id
+    """)).rowcount
+    if removed:
+        print(f"Removed {removed} duplicate project assignments")
+    connection.execute(text("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conname = 'uq_projectassignments_project_id_talent_id'
+            ) THEN
+                ALTER TABLE projectassignments
+                    ADD CONSTRAINT uq_projectassignments_project_id_talent_id UNIQUE (project_id, talent_id);
+            END IF;
+        END $$
+    """))
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_projectassignments_talent_id ON projectassignments (talent_id)",
+        "CREATE INDEX IF NOT EXISTS ix_talentskills_skill_id_talent_id ON talentskills (skill_id, talent_id)",
+        "CREATE INDEX IF NOT EXISTS ix_messages_conversation_id_message_id ON messages (conversation_id, message_id)",
+        "CREATE INDEX IF NOT EXISTS ix_chat_user_id_started_at ON chat (user_id, started_at)",
+        "CREATE INDEX IF NOT EXISTS ix_talents_department_id ON talents (department_id)",
+        "CREATE INDEX IF NOT EXISTS ix_certification_talent_id ON certification (talent_id)",
+    ):
+        connection.execute(text(statement))
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "hot path indexes and unique project assignments", _hot_path_indexes),
+]
+
+
+def migrate_postgres() -> List[int]:
+    """Create missing tables, then apply pending migrations in order; returns the versions applied."""
+    applied = []
+    with engine.connect() as connection:
+        connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        connection.commit()
+        try:
+            models.Base.metadata.create_all(bind=connection)
+            connection.execute(text("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version integer PRIMARY KEY,
+                    name text NOT NULL,
+                    applied_at timestamp NOT NULL DEFAULT now()
+                )
+            """))
+            connection.commit()
+
+            done = set(connection.execute(text("SELECT version FROM schema_migrations")).scalars())
+            for version, name, migration in MIGRATIONS:
+                if version in done:
+                    continue
+                migration(connection)
+                connection.execute(
+                    text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                    {"version": version, "name": name}
+                )
+                connection.commit()
+                applied.append(version)
+        finally:
+            connection.rollback()
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            connection.commit()
+    return applied
+
+
+def create_mongo_indexes() -> None:
+    from .clients import clients
+    from .ingestion import IngestionManifest, create_resume_indexes
+    from .jobs import JobStore
+
+    db = clients.mongo()["capybara_db"]
+    for name in RESUME_COLLECTIONS:
+        create_resume_indexes(db[name])
+    IngestionManifest(db[RESUME_COLLECTIONS[0]]).create_indexes()
+    JobStore(db["ingestion_jobs"]).create_indexes()
+
+
+def build_vector_snapshots() -> None:
+    """With VECTOR_BACKEND=local, snapshot any resume collection that has no local index yet."""
+    from .clients import clients
+    from .vector_index import VECTOR_BACKEND, get_vector_retriever
+
+    if VECTOR_BACKEND != "local":
+        return
+    db = clients.mongo()["capybara_db"]
+    for name in RESUME_COLLECTIONS:
+        index = get_vector_retriever(db[name])
+        if not index.exists():
+            index.refresh()
+
+
+def run() -> List[int]:
+    applied = migrate_postgres()
+    create_mongo_indexes()
+    build_vector_snapshots()
+    return applied
+
+
+if __name__ == "__main__":
+    applied = run()
+    print(f"Migrations complete (applied: {applied or 'none'})")
@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from .base import Base
 
 class ProjectAssignment(Base):
     __tablename__ = "projectassignments"
+    # A talent is assigned to a project at most once; the constraint's index also serves project_id filters
+    __table_args__ = (
+        UniqueConstraint("project_id", "talent_id", name="uq_projectassignments_project_id_talent_id"),
+        Index("ix_projectassignments_talent_id", "talent_id"),
+    )
 
     assignment_id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.project_id"))
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 
 class Certification(Base):
     __tablename__ = "certification"
+    __table_args__ = (
+        Index("ix_certification_talent_id", "talent_id"),
+    )
 
     certification_id = Column(Integer, primary_key=True, index=True)
     talent_id = Column(Integer, ForeignKey("talents.talent_id", ondelete="CASCADE"))
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 from datetime import datetime
 
 class Chat(Base):
     __tablename__ = "chat"
+    # A user's chats, newest first
+    __table_args__ = (
+        Index("ix_chat_user_id_started_at", "user_id", "started_at"),
+    )
 
     conversation_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.user_id"))
@@ -33,6 +37,10 @@ class Chat(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    # A conversation's messages in order, and keyset pages of them by message_id
+    __table_args__ = (
+        Index("ix_messages_conversation_id_message_id", "conversation_id", "message_id"),
+    )
 
     message_id = Column(Integer, primary_key=True, index=True)
     conversation_id = Column(Integer, ForeignKey("chat.conversation_id"))
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 
 class Talent(Base):
     __tablename__ = "talents"
+    __table_args__ = (
+        Index("ix_talents_department_id", "department_id"),
+    )
 
     talent_id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String, nullable=False)
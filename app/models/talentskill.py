@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Numeric
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Numeric, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 
 class TalentSkill(Base):
     __tablename__ = "talentskills"
+    # The primary key serves talent_id lookups; this one serves "who has skill X"
+    __table_args__ = (
+        Index("ix_talentskills_skill_id_talent_id", "skill_id", "talent_id"),
+    )
 
     # Composite primary key using talent_id and skill_id
     talent_id = Column(Integer, ForeignKey("talents.talent_id", ondelete="CASCADE"), primary_key=True)
@@ -0,0 +1,91 @@
+import base64
+import binascii
+import json
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import text
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count-Estimate"
+
+
+def encode_cursor(value: Any) -> str:
+    """Encode the last seen sort key into an opaque, URL-safe cursor"""
+    raw = json.dumps(value, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Any:
+    """Decode a cursor produced by encode_cursor, rejecting anything malformed"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def decode_key_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Decode a cursor holding an integer primary key"""
+    after_id = decode_cursor(cursor)
+    if after_id is not None and (not isinstance(after_id, int) or isinstance(after_id, bool)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return after_id
+
+
+def estimated_count(db, model) -> Optional[int]:
+    """
+    Row count estimate for a model's table from the planner statistics.
+
+    Costs one catalog lookup however big the table is, unlike COUNT(*). It
+    is as fresh as the last ANALYZE or autovacuum, so treat it as
+    approximate; None when the table has never been analyzed. Takes a sync
+    Session; from an AsyncSession use `await db.run_sync(estimated_count, Model)`.
+    """
+    reltuples = db.execute(
+        text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": model.__table__.name}
+    ).scalar()
+    if reltuples is None or reltuples < 0:
+        return None
+    return int(reltuples)
+
+
+class KeysetPage:
+    """
+    Paging parameters for list endpoints ordered by an integer primary key.
+
+    Use as `page: KeysetPage = Depends()`, then `page.apply(query, Model.id)`
+    and `page.set_headers(response, rows, Model.id, total)`. Each page is an
+    index range scan from the cursor, so page 1000 costs the same as page 1.
+    `skip` is still honoured when no cursor is given, for existing clients.
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Opaque cursor taken from the X-Next-Cursor header of the previous page"),
+        limit: int = Query(100, ge=1, le=1000, description="Page size"),
+        skip: int = Query(0, ge=0, deprecated=True, description="Offset paging; slows down on deep pages, use cursor instead"),
+        include_total: bool = Query(False, description="Send an estimated total row count in the X-Total-Count-Estimate header")
+    ):
+        self.after_id = decode_key_cursor(cursor)
+        self.limit = limit
+        self.skip = skip
+        self.include_total = include_total
+
+    def apply(self, statement, key_column):
+        """Restrict a Query or select() to this page"""
+        if self.after_id is not None:
+            statement = statement.filter(key_column > self.after_id)
+        elif self.skip:
+            statement = statement.offset(self.skip)
+        return statement.order_by(key_column).limit(self.limit)
+
+    def set_headers(self, response: Response, rows: Sequence, key_column, total: Optional[int] = None) -> None:
+        # A full page means there may be more; hand back the last key as the next cursor
+        if len(rows) == self.limit:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(rows[-1], key_column.key))
+        if total is not None:
+            response.headers[TOTAL_COUNT_HEADER] = str(total)
@@ -0,0 +1,156 @@
+"""
+Pure PDF text extraction used by the resume loaders.
+
+Kept free of database and model clients so it can run in worker processes
+(see app.ingestion.extract_files) without dragging those along. The PDF
+libraries are imported inside each function so the API process only loads
+them on first use: the chunk loaders read with PyPDF2, and resume text for
+the Gemini endpoints is read with pypdf, whether it comes from one upload or
+a batch.
+"""
+import os
+import json
+from typing import BinaryIO, Dict, Iterator, List, Optional
+from .chunking import CHUNK_SIZE, chunk_text
+
+def extract_pdf_pages(pdf_path: str) -> List[Dict]:
+    """Extract text and metadata from PDF."""
+    from PyPDF2 import PdfReader
+
+    try:
+        with open(pdf_path, 'rb') as file:
+            pdf = PdfReader(file)
+            documents = []
+            
+            for page_num in range(len(pdf.pages)):
+                page = pdf.pages[page_num]
+                text = page.extract_text()
+                
+                if text.strip():
+                    metadata = {
+                        "file_name": os.path.basename(pdf_path),
+                        "page_number": page_num + 1,
+                        "total_pages": len(pdf.pages),
+                        "source": "resume"
+                    }
+                    
+                    documents.append({
+                        "text": text,
+                        "metadata": metadata
+                    })
+            
+            return documents
+    
+    except Exception as e:
+        raise Exception(f"Error processing {pdf_path}: {str(e)}")
+
+def split_text_into_chunks(text: str, chunk_size: int = 500) -> List[str]:
+    """
+    Split text into smaller chunks of a specified size.
+    Args:
+        text (str): The text to split.
+        chunk_size (int): Maximum number of characters per chunk.
+    Returns:
+        List[str]: List of text chunks.
+    """
+    chunks = []
+    for i in range(0, len(text), chunk_size):
+        chunks.append(text[i:i + chunk_size])
+    return chunks
+
+def extract_pdf_chunks(pdf_path: str, chunk_size: int = CHUNK_SIZE) -> Dict:
+    """
+    Extract text and metadata from PDF, split text into chunks, and structure the output.
+    Args:
+        pdf_path (str): Path to the PDF file.
+        chunk_size (int): Maximum number of characters per chunk.
+    Returns:
+        Dict: Structured metadata and content.
+    """
+    from PyPDF2 import PdfReader
+
+    try:
+        with open(pdf_path, 'rb') as file:
+            pdf = PdfReader(file)
+            metadata = {
+                "metadata_id": 1,  # You can generate a unique ID here
+                "file_name": os.path.basename(pdf_path),
+                "total_pages": len(pdf.pages),
+                "source": "resume"
+            }
+            content = []
+            chunk_counter = 1  # To track chunk numbers across pages
+
+            for page_num in range(len(pdf.pages)):
+                page = pdf.pages[page_num]
+                text = page.extract_text()
+
+                if text.strip():
+                    # Split the page text on section, bullet and sentence boundaries
+                    chunks = chunk_text(text, chunk_size)
+
+                    for chunk in chunks:
+                        content.append({
+                            "page_num": page_num + 1,  # Page numbers start from 1
+                            "chunk_number": chunk_counter,
+                            "chunk_text": chunk
+                        })
+                        chunk_counter += 1  # Increment chunk counter
+
+            # Structure the result
+            result = {
+                "metadata": metadata,
+                "content": content
+            }
+
+            # Print the extracted content in JSON format
+            print("Extracted PDF Content (JSON Format):")
+            print(json.dumps(result, indent=4))  # Pretty-print JSON
+            return result
+
+    except Exception as e:
+        print(f"Error processing {pdf_path}: {str(e)}")
+        return {}
+
+def extract_chunk_documents(pdf_path: str) -> List[Dict]:
+    """Flatten extract_pdf_chunks output into one document per chunk."""
+    result = extract_pdf_chunks(pdf_path)
+    if not result:
+        raise Exception(f"Error processing {pdf_path}")
+    
+    return [
+        {
+            "text": chunk["chunk_text"],
+            "metadata": result["metadata"],
+            "chunk_number": chunk["chunk_number"],  # Add chunk_number
+            "page_number": chunk["page_num"]        # Add page_number
+        }
+        for chunk in result["content"]
+    ]
+
+class PageLimitExceeded(ValueError):
+    """The PDF has more pages than the caller accepts."""
+
+
+def iter_pdf_pages(stream: BinaryIO, max_pages: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of each page in turn, for the resume extraction prompt.
+
+    pypdf reads from the stream on demand, so only the page being extracted
+    is parsed into memory. A PDF with more than max_pages pages raises
+    PageLimitExceeded before any page is extracted.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(stream)
+    page_count = len(reader.pages)
+    if max_pages is not None and page_count > max_pages:
+        raise PageLimitExceeded(f"PDF has {page_count} pages, the limit is {max_pages}")
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def extract_pdf_text(pdf_path: str, max_pages: Optional[int] = None) -> str:
+    """Concatenate the text of every page, as the resume extraction prompt expects."""
+    with open(pdf_path, 'rb') as file:
+        return "".join(iter_pdf_pages(file, max_pages)).strip()
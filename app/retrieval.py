@@ -0,0 +1,72 @@
+import os
+from typing import Dict, List, Optional
+
+from .vector_index import get_vector_retriever
+
+# Reciprocal rank fusion settings, see hybrid_search
+HYBRID_TEXT_WEIGHT = float(os.getenv("HYBRID_TEXT_WEIGHT", "1.0"))
+HYBRID_VECTOR_WEIGHT = float(os.getenv("HYBRID_VECTOR_WEIGHT", "1.0"))
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+
+
+def text_search(collection, query: str, limit: int) -> List[Dict]:
+    """Rank chunks by MongoDB $text score."""
+    results = collection.find(
+        {"$text": {"$search": query}},
+        {"score": {"$meta": "textScore"}, "embedding_array": 0}
+    ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+    return list(results)
+
+
+def hybrid_search(
+    collection,
+    query: str,
+    query_embedding: List[float],
+    limit: int = 5,
+    text_weight: float = HYBRID_TEXT_WEIGHT,
+    vector_weight: float = HYBRID_VECTOR_WEIGHT,
+    rrf_k: int = HYBRID_RRF_K,
+    candidates: Optional[int] = None
+) -> List[Dict]:
+    """
+    Fuse the lexical and vector rankings with weighted reciprocal rank fusion.
+
+    Each ranking contributes weight / (rrf_k + rank) for every chunk it returns,
+    so a chunk ranked well by both beats one ranked first by only one of them.
+    Returned chunks carry the fused "score" plus the per-ranking "text_rank",
+    "text_score", "vector_rank" and "vector_score" (None when not matched).
+    """
+    candidates = max(candidates or HYBRID_CANDIDATES, limit)
+
+    rankings = []
+    if text_weight > 0:
+        rankings.append(("text", text_weight, text_search(collection, query, candidates)))
+    if vector_weight > 0:
+        rankings.append(("vector", vector_weight, get_vector_retriever(collection).search(query_embedding, limit=candidates)))
+
+    fused: Dict[str, Dict] = {}
+    for source, weight, results in rankings:
+        for rank, doc in enumerate(results, start=1):
+            entry = fused.get(str(doc["_id"]))
+            if entry is None:
+                entry = fused[str(doc["_id"])] = {
+                    "doc": doc,
+                    "score": 0.0,
+                    "text_rank": None,
+                    "text_score": None,
+                    "vector_rank": None,
+                    "vector_score": None
+                }
+            entry["score"] += weight / (rrf_k + rank)
+            entry[f"{source}_rank"] = rank
+            entry[f"{source}_score"] = doc.get("score")
+
+    ranked = sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:limit]
+
+    results = []
+    for entry in ranked:
+        doc = dict(entry.pop("doc"))
+        doc.update(entry)
+        results.append(doc)
+    return results
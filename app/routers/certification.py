@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
+from ..pagination import KeysetPage, estimated_count
 from ..models.certification import Certification
 from ..schemas.certification import CertificationBase, CertificationResponse, CertificationUpdate, CertificationCreate
 
 router = APIRouter(prefix="/certifications", tags=["certifications"])
 
 @router.get("/", response_model=List[CertificationResponse])
-def get_certifications(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(Certification).offset(skip).limit(limit).all()
+def get_certifications(response: Response, page: KeysetPage = Depends(), db: Session = Depends(get_db)):
+    certifications = page.apply(db.query(Certification), Certification.certification_id).all()
+    page.set_headers(response, certifications, Certification.certification_id, estimated_count(db, Certification) if page.include_total else None)
+    return certifications
 
 @router.get("/{certification_id}", response_model=CertificationResponse)
 def get_certification(certification_id: int, db: Session = Depends(get_db)):
@@ -1,51 +1,32 @@
 import os
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Dict
-from pymongo import MongoClient
-from langchain_mongodb import MongoDBAtlasVectorSearch
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_google_genai.embeddings import GoogleGenerativeAIEmbeddings
-from langchain.chains import RetrievalQA
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Dict, Optional
 from datetime import datetime
-from ..database import get_db
-import certifi
+from ..database import get_db, get_async_db
 from ..models.chat import Chat, Message
 from ..schemas.chat import ChatResponse, ChatListResponse, MessageResponse, MessageCreate   
+from ..vector_index import get_vector_retriever
+from ..retrieval import hybrid_search
+from ..clients import clients
+from ..concurrency import run_blocking
+from ..context_builder import build_context
+from ..streaming import sse_response, stream_llm_answer
 
-try:
-    client = MongoClient(
-        os.getenv("MONGODB_ATLAS_CLUSTER_URI"),
-        tlsCAFile=certifi.where()
-    )
-    
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash",
-        temperature=0.7
-    )
-    
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-    
-except Exception as e:
-    print(f"Initialization error: {e}")
-    raise e
 
 SYSTEM_PROMPT = """
 [Your existing system prompt here]
 """
 
 def find_similar_resumes(query: str, limit: int = 5) -> List[Dict]:
-    """Find similar resumes using text search and embedding similarity."""
-    collection = client["capybara_db"]["resumes"]
-    
-    query_embedding = embeddings.embed_query(query)
+    """Find similar resumes by fusing text search and embedding similarity rankings."""
+    collection = clients.mongo()["capybara_db"]["resumes"]
     
-    results = collection.find(
-        {"$text": {"$search": query}},
-        {"score": {"$meta": "textScore"}}
-    ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+    query_embedding = clients.embeddings().embed_query(query)
     
-    return list(results)
+    return hybrid_search(collection, query, query_embedding, limit=limit)
 
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
@@ -58,36 +39,67 @@ def create_chat(user_id: int, db: Session = Depends(get_db)):
     db.refresh(new_chat)
     return new_chat
 
+# Chat history reads go through the async engine; writes stay on the sync session
 @router.get("/{user_id}/{chat_id}", response_model=ChatResponse)
-async def get_chat(user_id: int, chat_id: int, db: Session = Depends(get_db)):
-    chat = db.query(Chat).filter(Chat.conversation_id == chat_id, Chat.user_id == user_id).first()
+async def get_chat(user_id: int, chat_id: int, db: AsyncSession = Depends(get_async_db)):
+    # Async sessions cannot lazy-load, so fetch the messages with the chat (one extra IN query)
+    chat = await db.scalar(
+        select(Chat)
+        .where(Chat.conversation_id == chat_id, Chat.user_id == user_id)
+        .options(selectinload(Chat.messages))
+    )
     if not chat:
         raise HTTPException(status_code=404, detail="Chat not found")
     return chat
 
 @router.get("/{user_id}", response_model=List[ChatListResponse])
-def get_user_chats(user_id: int, db: Session = Depends(get_db)):
+async def get_user_chats(user_id: int, db: AsyncSession = Depends(get_async_db)):
     try:
-        chats = db.query(Chat).filter(Chat.user_id == user_id).order_by(Chat.started_at.desc()).all()
-        if not chats:
-            return []
-        return chats
+        result = await db.execute(select(Chat).where(Chat.user_id == user_id).order_by(Chat.started_at.desc()))
+        return result.scalars().all()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{user_id}/{chat_id}/messages", response_model=List[MessageResponse])
-async def get_chat_messages(user_id: int, chat_id: int, db: Session = Depends(get_db)):
+async def get_chat_messages(
+    user_id: int,
+    chat_id: int,
+    since: Optional[int] = Query(None, description="Only messages after this message_id, for polling new messages"),
+    before: Optional[int] = Query(None, description="Only messages before this message_id, for loading older history"),
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    A page of a chat's messages, always oldest first.
+
+    With since, the first `limit` messages after it; poll again with the
+    last message_id received. Otherwise the latest `limit` messages (before
+    `before` when given). A full page means there may be more.
+    """
     try:
-        chat = db.query(Chat).filter(Chat.conversation_id == chat_id, Chat.user_id == user_id).first()
-        if not chat:
+        chat_exists = await db.scalar(
+            select(Chat.conversation_id).where(Chat.conversation_id == chat_id, Chat.user_id == user_id)
+        )
+        if chat_exists is None:
             raise HTTPException(status_code=404, detail="Chat not found")
-        messages = db.query(Message).filter(Message.conversation_id == chat_id).order_by(Message.created_at).all()
-        return messages
+        statement = select(Message).where(Message.conversation_id == chat_id)
+        if since is not None:
+            statement = statement.where(Message.message_id > since)
+        if before is not None:
+            statement = statement.where(Message.message_id < before)
+        if since is not None:
+            result = await db.execute(statement.order_by(Message.message_id).limit(limit))
+            return result.scalars().all()
+        # Newest page first from the index, then back into reading order
+        result = await db.execute(statement.order_by(Message.message_id.desc()).limit(limit))
+        return result.scalars().all()[::-1]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{user_id}/{chat_id}/message", response_model=MessageResponse)
-async def create_message(
+def create_message(
     user_id: int, 
     chat_id: int, 
     message: MessageCreate, 
@@ -111,14 +123,14 @@ async def create_message(
     )
     
     try:
-        db.add(new_message)
-        if message.sender == "user" and len(chat.messages) == 0:
+        # EXISTS stops at the first message instead of loading the whole history
+        if message.sender == "user" and not db.query(exists().where(Message.conversation_id == chat_id)).scalar():
             chat.title = (
                 message.message_text[:30] + "..." 
                 if len(message.message_text) > 30 
                 else message.message_text
             )
-        
+        db.add(new_message)
         db.commit()
         db.refresh(new_message)
         return new_message
@@ -140,7 +152,8 @@ async def create_message(
 @router.get("/ask-question/")
 async def ask_question(
     question: str = Query(..., description="Your question or project requirements"),
-    is_team_assembly: bool = Query(True, description="Set to True for team assembly requests")
+    is_team_assembly: bool = Query(True, description="Set to True for team assembly requests"),
+    stream: bool = Query(False, description="Stream the answer as server-sent events: sources first, then tokens")
 ):
     try:
         if is_team_assembly:
@@ -152,92 +165,94 @@ async def ask_question(
                 )
             
             # Find relevant resumes
-            relevant_resumes = find_similar_resumes(question)
+            relevant_resumes = await run_blocking(find_similar_resumes, question)
             
             # Build context for the prompt
-            context = "\n\nAvailable Candidates:\n"
-            for resume in relevant_resumes:
-                context += f"Candidate from {resume['metadata']['file_name']}:\n{resume['text']}\n\n"
+            candidates, relevant_resumes, context_usage = build_context(
+                relevant_resumes, lambda resume: f"Candidate from {resume['metadata']['file_name']}:"
+            )
+            context = "\n\nAvailable Candidates:\n" + candidates
             
             # Create the prompt for the LLM
             prompt = f"{SYSTEM_PROMPT}\n\nProject Requirements:\n{question}\n{context}"
+            sources = [
+                {
+                    "file_name": resume["metadata"]["file_name"],
+                    "page_number": resume.get("page_number", "N/A"),  # Use get to avoid KeyError
+                    "score": resume["score"]
+                }
+                for resume in relevant_resumes
+            ]
+            
+            if stream:
+                return sse_response(stream_llm_answer(clients.llm(), prompt, {
+                    "type": "team_assembly",
+                    "project_requirements": question,
+                    "sources": sources,
+                    "context_usage": context_usage
+                }))
             
             # Get the response from the LLM
-            response = llm.predict(prompt)
+            response = await run_blocking(clients.llm().predict, prompt)
             
             # Return the team assembly response
             return {
                 "type": "team_assembly",
                 "project_requirements": question,
                 "team_recommendation": response,
-                "sources": [
-                    {
-                        "file_name": resume["metadata"]["file_name"],
-                        "page_number": resume.get("page_number", "N/A")  # Use get to avoid KeyError
-                    }
-                    for resume in relevant_resumes
-                ]
+                "sources": sources,
+                "context_usage": context_usage
             }
         else:
             # General question logic with RAG
             # Step 1: Retrieve relevant documents from MongoDB using vector search
-            collection = client["capybara_db"]["resumes"]
+            collection = clients.mongo()["capybara_db"]["resumes"]
             
             # Generate embedding for the question
-            query_embedding = embeddings.embed_query(question)
+            query_embedding = await run_blocking(clients.embeddings().embed_query, question)
             
-            # Perform vector search
-            results = collection.aggregate([
-                {
-                    "$vectorSearch": {
-                        "index": "vector_index",  # Replace with your vector index name
-                        "path": "embedding_array",  # Field containing the embeddings
-                        "queryVector": query_embedding,
-                        "numCandidates": 10,  # Number of candidates to retrieve
-                        "limit": 5  # Number of results to return
-                    }
-                },
-                {
-                    "$project": {
-                        "text": 1,
-                        "metadata": 1,
-                        "score": { "$meta": "vectorSearchScore" }
-                    }
-                }
-            ])
-            
-            # Convert results to a list
-            relevant_documents = list(results)
+            # Perform vector search with the configured backend (Atlas or local index)
+            relevant_documents = await run_blocking(get_vector_retriever(collection).search, query_embedding, limit=5)
             
             # Step 2: Build context for the prompt
-            context = "\n\nRelevant Documents:\n"
-            for doc in relevant_documents:
-                context += f"Document: {doc['metadata']['file_name']}\n{doc['text']}\n\n"
+            documents, relevant_documents, context_usage = build_context(
+                relevant_documents, lambda doc: f"Document: {doc['metadata']['file_name']}"
+            )
+            context = "\n\nRelevant Documents:\n" + documents
             
             # Step 3: Create the prompt for the LLM
             prompt = f"{SYSTEM_PROMPT}\n\nQuestion:\n{question}\n{context}"
+            sources = [
+                {
+                    "file_name": doc["metadata"]["file_name"],
+                    "page_number": doc.get("page_number", "N/A")  # Use get to avoid KeyError
+                }
+                for doc in relevant_documents
+            ]
+            
+            if stream:
+                return sse_response(stream_llm_answer(clients.llm(), prompt, {
+                    "type": "general_question",
+                    "sources": sources,
+                    "context_usage": context_usage
+                }))
             
             # Step 4: Get the response from the LLM
-            response = llm.predict(prompt)
+            response = await run_blocking(clients.llm().predict, prompt)
             
             # Step 5: Return the response
             return {
                 "type": "general_question",
                 "content": response,
-                "sources": [
-                    {
-                        "file_name": doc["metadata"]["file_name"],
-                        "page_number": doc.get("page_number", "N/A")  # Use get to avoid KeyError
-                    }
-                    for doc in relevant_documents
-                ]
+                "sources": sources,
+                "context_usage": context_usage
             }
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.delete("/{user_id}/{chat_id}", )
-async def delete_chat(
+def delete_chat(
     user_id: int,
     chat_id: int,
     db: Session = Depends(get_db)
@@ -1,16 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 
 from ..database import get_db
+from ..pagination import KeysetPage, estimated_count
 from ..models.department import Department
 from ..schemas.department import DepartmentResponse, DepartmentBase
 
 router = APIRouter(prefix="/departments", tags=["Departments"])
 
 @router.get("/", response_model=List[DepartmentResponse])
-def get_departments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(Department).offset(skip).limit(limit).all()
+def get_departments(response: Response, page: KeysetPage = Depends(), db: Session = Depends(get_db)):
+    departments = page.apply(db.query(Department), Department.department_id).all()
+    page.set_headers(response, departments, Department.department_id, estimated_count(db, Department) if page.include_total else None)
+    return departments
 
 @router.get("/{department_id}", response_model=DepartmentResponse)
 def get_department(department_id: int, db: Session = Depends(get_db)):
@@ -1,34 +1,46 @@
+import asyncio
+import functools
+import hashlib
+import json
 import os
-from io import BytesIO
-from typing import List, Optional, Union
+import shutil
+import tempfile
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Tuple, Union
 
 from dotenv import load_dotenv
-from fastapi import APIRouter, File, HTTPException, UploadFile
-from langchain_core.output_parsers import JsonOutputParser
-from langchain_core.prompts import PromptTemplate
-from langchain_google_genai import GoogleGenerativeAI
+from fastapi import APIRouter, File, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from pypdf import PdfReader
+from starlette.background import BackgroundTask
+
+from ..cache import get_store
+from ..clients import clients
+from ..concurrency import run_blocking
+from ..ingestion import PDF_EXTRACT_WORKERS, ExtractionPool, extract_files, file_sha256
+from ..pdf_extraction import PageLimitExceeded, extract_pdf_text, iter_pdf_pages
+from ..uploads import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_PAGES, check_upload_size, hash_upload
 
 load_dotenv()
 
 router = APIRouter(prefix="/gemini", tags=["Gemini AI"])
 
-llm = GoogleGenerativeAI(
-    model="gemini-1.5-flash",
-    temperature=0,
-    api_key=os.getenv("GEMINI_API_KEY"),
-)
+RESUME_MODEL = "gemini-1.5-flash"
+
+
+def pdf_error(e: Exception) -> HTTPException:
+    """How a PDF that could not be read is reported, by the single-file and batch endpoints alike."""
+    if isinstance(e, PageLimitExceeded):
+        return HTTPException(status_code=413, detail=str(e))
+    return HTTPException(status_code=400, detail=f"Error reading PDF: {str(e)}")
 
 
-def read_pdf_file(file_contents: BytesIO):
-    """Extract text from a PDF file."""
+def read_pdf_file(file_contents: BinaryIO, max_pages: int = UPLOAD_MAX_PAGES):
+    """Extract text from a PDF file, one page at a time."""
     try:
-        pdf_reader = PdfReader(file_contents)
-        text = "".join(page.extract_text() for page in pdf_reader.pages if page.extract_text())
+        text = "".join(iter_pdf_pages(file_contents, max_pages))
         return text.strip()
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error reading PDF: {str(e)}")
+        raise pdf_error(e)
 
 
 class ResumeReport(BaseModel):
@@ -104,130 +116,298 @@ class ResumeReport(BaseModel):
 #     except Exception as e:
 #         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
 
-@router.post("/summarize_resume")
-async def summarize_resume(file: UploadFile = File(...)):
-    """Extract structured data from a resume (PDF) using Gemini API."""
-    if not file.filename.endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+RESUME_EXTRACTION_PROMPT = """
+    You are a meticulous hiring manager tasked with extracting key information from a resume. Your job is to convert the unstructured data into a structured JSON format.
 
-    try:
-        contents = await file.read()
-        text = read_pdf_file(BytesIO(contents))
+    Please extract the information from the resume provided below, delimited by triple backticks, and present it as a JSON object with the following fields. If any information is missing, include the key with a `null` value:
+
+    ### **📌 Fields to Extract**
+    1. **profilePic**: URL of the candidate’s profile picture (if available). If not found, return `null`.
+
+    2. **firstName**: The first name of the candidate.
+    - If you encounter a 'bin' or 'binti' keyword, extract everything **before** that as the `firstName`.
+
+    3. **lastName**: The last name of the candidate.
+    - If you encounter a 'bin' or 'binti' keyword, extract everything **after** that as the `lastName`.
+
+    4. **email**: Candidate's email address (must be valid format).
+
+    5. **phone**: Candidate's phone number.
+    - Example: `+60123456789`
+    - Ensure it is properly formatted with country code (if available).
+
+    6. **dateOfBirth**: The candidate's birth date in `YYYY-MM-DD` format.
+
+    7. **age**: The candidate’s age in years.
+    - Calculate it based on `dateOfBirth`.
+
+    8. **gender**: The candidate's gender (if explicitly mentioned).
+
+    9. **maritalStatus**: The candidate's marital status (if mentioned).
+
+    10. **currentCountry**: The country where the candidate currently resides.
+
+    11. **currentCity**: The city where the candidate currently resides.
 
-        prompt = f"""
-            You are a meticulous hiring manager tasked with extracting key information from a resume. Your job is to convert the unstructured data into a structured JSON format.
+    12. **willingToRelocate**: `true` if the candidate explicitly states willingness to relocate, otherwise `false`.
 
-            Please extract the information from the resume provided below, delimited by triple backticks, and present it as a JSON object with the following fields. If any information is missing, include the key with a `null` value:
+    13. **relocationPreferences**: A list of preferred relocation locations if mentioned.
 
-            ### **📌 Fields to Extract**
-            1. **profilePic**: URL of the candidate’s profile picture (if available). If not found, return `null`.
+    14. **summary**: A concise summary of the candidate’s qualifications, skills, and experience.
 
-            2. **firstName**: The first name of the candidate.
-            - If you encounter a 'bin' or 'binti' keyword, extract everything **before** that as the `firstName`.
+    15. **experience**: Number of years the candidate has been working. Strictly in numeric data type
+        - Please check candidate latest and earliest working year
+        - Example : 2019 is earliest and present/now is the earliest
+        - Please check current year
+        - experience = current year - 2019
+        - return data in numeric/integer type
 
-            3. **lastName**: The last name of the candidate.
-            - If you encounter a 'bin' or 'binti' keyword, extract everything **after** that as the `lastName`.
+    16. **skills**: List of technical, professional, and language skills.
+        - Do not include hobbies unless explicitly mentioned as skills.
 
-            4. **email**: Candidate's email address (must be valid format).
+    17. **education**: A list of educational qualifications with these details:
+        - **institution**: Name of the institution.
+        - **level**: Level of education (e.g., Bachelor's, Master's, PhD).
+        - **degree**: Full degree title.
+        - **field**: Extracted field from the degree.
+        - **cgpa**: Cumulative Grade Point Average (if provided).
+        - **start_year**: Start year of the program.
+        - **graduation_year**: Graduation or expected graduation year.
 
-            5. **phone**: Candidate's phone number.
-            - Example: `+60123456789`
-            - Ensure it is properly formatted with country code (if available).
+    18. **experiences**: A list of past jobs, each with:
+        - **company**: Name of the employer.
+        - **position**: Job title.
+        - **startDate**: Start date in `YYYY-MM-DD` format.
+        - **endDate**: End date in `YYYY-MM-DD` format (or `null` if still employed).
+        - **responsibilities**: List of key responsibilities.
 
-            6. **dateOfBirth**: The candidate's birth date in `YYYY-MM-DD` format.
+    19. **certifications**: A list of certifications with:
+        - **name**: Certification title.
+        - **issuedBy**: Issuing organization.
+        - **year**: Year obtained.
 
-            7. **age**: The candidate’s age in years.
-            - Calculate it based on `dateOfBirth`.
+    20. **jobTitle**: The candidate’s desired job title.
 
-            8. **gender**: The candidate's gender (if explicitly mentioned).
+    21. **jobPosition**: The job position level (e.g., Junior, Senior).
 
-            9. **maritalStatus**: The candidate's marital status (if mentioned).
+    22. **department**: The department the candidate works in (if mentioned).
 
-            10. **currentCountry**: The country where the candidate currently resides.
+    23. **employmentType**: Type of employment (`fullTime`, `partTime`, `contract`, etc.).
 
-            11. **currentCity**: The city where the candidate currently resides.
+    24. **contractDuration**: The length of the employment contract (if applicable).
 
-            12. **willingToRelocate**: `true` if the candidate explicitly states willingness to relocate, otherwise `false`.
+    25. **employmentRemarks**: Any additional employment-related remarks.
 
-            13. **relocationPreferences**: A list of preferred relocation locations if mentioned.
+    26. **salary**: Expected or current salary in numeric format.
 
-            14. **summary**: A concise summary of the candidate’s qualifications, skills, and experience.
+    ---
 
-            15. **experience**: Number of years the candidate has been working. Strictly in numeric data type
-                - Please check candidate latest and earliest working year
-                - Example : 2019 is earliest and present/now is the earliest
-                - Please check current year
-                - experience = current year - 2019
-                - return data in numeric/integer type
+    ### **📌 Additional Rules**
+    - **Do not hallucinate data**: If a value is missing, set it as `null` rather than guessing.
+    - **Ensure correct JSON formatting**.
+    - **Ignore newlines (`\n`) in the text**.
+    - **Validate extracted data**:
+    - Emails must match a valid email format.
+    - Phone numbers should contain only numbers and valid symbols (`+`, `-`, `()`, `.`).
+    - Dates should be in `YYYY-MM-DD` format.
+    - If `firstName`, `lastName`, `email`, or `phone` is uncertain, return `null`.
 
-            16. **skills**: List of technical, professional, and language skills.
-                - Do not include hobbies unless explicitly mentioned as skills.
+    ```{text}```
 
-            17. **education**: A list of educational qualifications with these details:
-                - **institution**: Name of the institution.
-                - **level**: Level of education (e.g., Bachelor's, Master's, PhD).
-                - **degree**: Full degree title.
-                - **field**: Extracted field from the degree.
-                - **cgpa**: Cumulative Grade Point Average (if provided).
-                - **start_year**: Start year of the program.
-                - **graduation_year**: Graduation or expected graduation year.
+    Please ensure the JSON output is correctly formatted and follows these rules strictly.
+    """
 
-            18. **experiences**: A list of past jobs, each with:
-                - **company**: Name of the employer.
-                - **position**: Job title.
-                - **startDate**: Start date in `YYYY-MM-DD` format.
-                - **endDate**: End date in `YYYY-MM-DD` format (or `null` if still employed).
-                - **responsibilities**: List of key responsibilities.
+# Changes whenever the prompt or model does, so cached extractions from an older prompt are never served
+PROMPT_VERSION = hashlib.sha256(f"{RESUME_MODEL}\0{RESUME_EXTRACTION_PROMPT}".encode("utf-8")).hexdigest()[:16]
 
-            19. **certifications**: A list of certifications with:
-                - **name**: Certification title.
-                - **issuedBy**: Issuing organization.
-                - **year**: Year obtained.
+RESUME_CACHE_PATH = os.getenv("RESUME_CACHE_PATH", ".cache/resume_summaries.sqlite3")
+# Gemini extractions in flight at once per worker for batch requests
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "4"))
+RESUME_BATCH_MAX_FILES = int(os.getenv("RESUME_BATCH_MAX_FILES", "200"))
 
-            20. **jobTitle**: The candidate’s desired job title.
+_gemini_slots = asyncio.Semaphore(GEMINI_CONCURRENCY)
 
-            21. **jobPosition**: The job position level (e.g., Junior, Senior).
 
-            22. **department**: The department the candidate works in (if mentioned).
+class ResumeBatchResult(BaseModel):
+    filename: str
+    status: str  # "ok" or "error"
+    cached: bool = False
+    summary: Optional[Dict] = None
+    error: Optional[str] = None
+    # For errors, the status /summarize_resume would have answered with for this file
+    status_code: Optional[int] = None
 
-            23. **employmentType**: Type of employment (`fullTime`, `partTime`, `contract`, etc.).
+    @classmethod
+    def failed(cls, filename: str, e: HTTPException) -> "ResumeBatchResult":
+        return cls(filename=filename, status="error", error=e.detail, status_code=e.status_code)
 
-            24. **contractDuration**: The length of the employment contract (if applicable).
 
-            25. **employmentRemarks**: Any additional employment-related remarks.
+def summary_cache_key(content_hash: str) -> str:
+    return f"{PROMPT_VERSION}:{content_hash}"
 
-            26. **salary**: Expected or current salary in numeric format.
 
-            ---
+def get_cached_summary(key: str) -> Optional[Dict]:
+    cached = get_store(RESUME_CACHE_PATH, "resume_summaries").get(key)
+    return json.loads(cached) if cached is not None else None
 
-            ### **📌 Additional Rules**
-            - **Do not hallucinate data**: If a value is missing, set it as `null` rather than guessing.
-            - **Ensure correct JSON formatting**.
-            - **Ignore newlines (`\n`) in the text**.
-            - **Validate extracted data**:
-            - Emails must match a valid email format.
-            - Phone numbers should contain only numbers and valid symbols (`+`, `-`, `()`, `.`).
-            - Dates should be in `YYYY-MM-DD` format.
-            - If `firstName`, `lastName`, `email`, or `phone` is uncertain, return `null`.
 
-            ```{text}```
+def store_summary(key: str, summary: Dict) -> None:
+    get_store(RESUME_CACHE_PATH, "resume_summaries").set(key, json.dumps(summary).encode("utf-8"))
 
-            Please ensure the JSON output is correctly formatted and follows these rules strictly.
-            """
 
+def _build_resume_chain():
+    # Imported here so langchain and the Gemini SDK load on the first extraction, not at startup
+    from langchain_core.output_parsers import JsonOutputParser
+    from langchain_core.prompts import PromptTemplate
+    from langchain_google_genai import GoogleGenerativeAI
 
-        prompt_template = PromptTemplate(template=prompt, input_variables=["text"])
-        output_parser = JsonOutputParser()
+    llm = GoogleGenerativeAI(
+        model=RESUME_MODEL,
+        temperature=0,
+        api_key=os.getenv("GEMINI_API_KEY"),
+    )
+    return PromptTemplate(template=RESUME_EXTRACTION_PROMPT, input_variables=["text"]) | llm | JsonOutputParser()
+
+
+def extract_resume(text: str) -> Dict:
+    """Run the extraction prompt over resume text and return the parsed JSON."""
+    response = clients.get("resume_chain", _build_resume_chain).invoke({"text": text})
+
+    if not isinstance(response, dict):
+        raise ValueError("Invalid response format from Gemini")
+
+    return response
 
-        # Execute the chain
-        chain = prompt_template | llm | output_parser
-        response = chain.invoke({"text": text})
 
-        if not isinstance(response, dict):
-            raise ValueError("Invalid response format from Gemini")
+def summarize_upload(file: UploadFile, bypass_cache: bool = False) -> Tuple[Dict, bool]:
+    """Return (extracted resume, served from cache) for an uploaded PDF, reading it from its spooled file."""
+    check_upload_size(file)
+    key = summary_cache_key(hash_upload(file))
+    if not bypass_cache:
+        cached = get_cached_summary(key)
+        if cached is not None:
+            return cached, True
 
-        return response  # Directly return as a dictionary
+    summary = extract_resume(read_pdf_file(file.file))
+    store_summary(key, summary)
+    return summary, False
 
+
+@router.post("/summarize_resume")
+async def summarize_resume(
+    response: Response,
+    file: UploadFile = File(...),
+    bypass_cache: bool = Query(False, description="Re-run extraction even if this exact file was summarized before")
+):
+    """Extract structured data from a resume (PDF) using Gemini API."""
+    if not file.filename.endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+    try:
+        summary, cached = await run_blocking(summarize_upload, file, bypass_cache)
+        response.headers["X-Cache"] = "hit" if cached else "miss"
+
+        return summary  # Directly return as a dictionary
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
 
+
+def _extraction_pool() -> ExtractionPool:
+    # Kept for the life of the process so batches reuse warm workers; clients.close() shuts it down
+    return clients.get("resume_extraction_pool", lambda: ExtractionPool(PDF_EXTRACT_WORKERS))
+
+
+def _spool_uploads(files: List[UploadFile], directory: str) -> Dict[str, Tuple[str, str]]:
+    """Copy uploads to disk so worker processes can parse them; returns {path: (filename, content hash)}."""
+    spooled = {}
+    for index, file in enumerate(files):
+        path = os.path.join(directory, f"{index:05d}.pdf")
+        with open(path, "wb") as out:
+            shutil.copyfileobj(file.file, out, UPLOAD_CHUNK_SIZE)
+        spooled[path] = (file.filename, file_sha256(path))
+    return spooled
+
+
+async def _summarize_batch(
+    rejected: List[Tuple[str, HTTPException]],
+    spooled: Dict[str, Tuple[str, str]],
+    bypass_cache: bool
+) -> AsyncIterator[str]:
+    for filename, e in rejected:
+        yield ResumeBatchResult.failed(filename, e).model_dump_json() + "\n"
+
+    to_parse = {}
+    for path, (filename, content_hash) in spooled.items():
+        cached = None if bypass_cache else await run_blocking(get_cached_summary, summary_cache_key(content_hash))
+        if cached is not None:
+            yield ResumeBatchResult(filename=filename, status="ok", cached=True, summary=cached).model_dump_json() + "\n"
+        else:
+            to_parse[path] = path
+
+    async def summarize(filename: str, content_hash: str, text: str) -> ResumeBatchResult:
+        try:
+            async with _gemini_slots:
+                summary = await run_blocking(extract_resume, text)
+            await run_blocking(store_summary, summary_cache_key(content_hash), summary)
+            return ResumeBatchResult(filename=filename, status="ok", summary=summary)
+        except Exception as e:
+            return ResumeBatchResult.failed(filename, HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}"))
+
+    # Parse in the process pool and start each Gemini call as soon as its file is parsed
+    pending = set()
+    extract_text = functools.partial(extract_pdf_text, max_pages=UPLOAD_MAX_PAGES)
+    async for path, text, error in extract_files(to_parse, extract_text, pool=_extraction_pool()):
+        filename, content_hash = spooled[path]
+        if error is not None:
+            yield ResumeBatchResult.failed(filename, pdf_error(error)).model_dump_json() + "\n"
+        else:
+            pending.add(asyncio.create_task(summarize(filename, content_hash, text)))
+
+        for task in [task for task in pending if task.done()]:
+            pending.discard(task)
+            yield task.result().model_dump_json() + "\n"
+
+    for task in asyncio.as_completed(pending):
+        yield (await task).model_dump_json() + "\n"
+
+
+@router.post("/summarize_resumes")
+async def summarize_resumes(
+    files: List[UploadFile] = File(...),
+    bypass_cache: bool = Query(False, description="Re-run extraction even for files summarized before")
+):
+    """
+    Extract structured data from many resumes in one request.
+
+    Returns NDJSON with one ResumeBatchResult per file in completion order;
+    a file that fails is reported on its own line, with the status and detail
+    /summarize_resume would have returned for it, without failing the batch.
+    """
+    if len(files) > RESUME_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {RESUME_BATCH_MAX_FILES} files per batch")
+
+    directory = tempfile.mkdtemp(prefix="resume-batch-")
+    try:
+        pdfs, rejected = [], []
+        for file in files:
+            try:
+                if not file.filename.endswith(".pdf"):
+                    raise HTTPException(status_code=400, detail="Only PDF files are supported")
+                check_upload_size(file)
+                pdfs.append(file)
+            except HTTPException as e:
+                rejected.append((file.filename, e))
+        # Uploads are closed once the endpoint returns, so copy them out before streaming
+        spooled = await asyncio.to_thread(_spool_uploads, pdfs, directory)
+    except Exception as e:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise HTTPException(status_code=500, detail=f"Error receiving files: {str(e)}")
+
+    return StreamingResponse(
+        _summarize_batch(rejected, spooled, bypass_cache),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(shutil.rmtree, directory, ignore_errors=True)
+    )
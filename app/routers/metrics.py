@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from ..database import pool_status
+from ..schemas.metrics import PoolMetricsResponse
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+# Counters are per worker process; scrape every worker (or run one) when sizing pools
+@router.get("/db-pool", response_model=PoolMetricsResponse)
+def get_db_pool_metrics():
+    return pool_status()
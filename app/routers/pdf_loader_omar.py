@@ -1,44 +1,36 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, status
 import os
+import asyncio
 import json 
-from typing import List, Dict
-from PyPDF2 import PdfReader
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from pymongo import MongoClient, ASCENDING, TEXT
-import certifi
+from typing import List, Dict, Optional
 from pydantic import BaseModel
+from ..vector_index import get_vector_retriever
+from ..clients import clients
+from ..ingestion import IngestionManifest, bump_corpus_version, reindex_folder, EMBEDDING_BATCH_SIZE
+from ..jobs import JobStore, JobAlreadyRunning, ProgressCallback, run_job, submit_job
+from ..schemas.ingestion import IngestionJobResponse
+from ..pdf_extraction import extract_chunk_documents
+from ..chunking import CHUNKER_VERSION
 
 router = APIRouter(prefix="/pdf-omar", tags=["PDF Omar Processing"])
 
-# Initialize MongoDB client and embeddings
-try:
-    client = MongoClient(
-        os.getenv("MONGODB_ATLAS_CLUSTER_URI"),
-        tlsCAFile=certifi.where()
-    )
-    
-    embeddings = GoogleGenerativeAIEmbeddings(
-        model="models/embedding-001",
-        google_api_key=os.getenv("GOOGLE_API_KEY")
-    )
-    
-    # Setup MongoDB collections
-    db = client["capybara_db"]
-    collection = db["resumes_db"]
-    
-    # Ensure indexes exist
-    collection.create_index([("text", TEXT)])
-    collection.create_index([("metadata.file_name", ASCENDING)])
-    
-except Exception as e:
-    print(f"Initialization error: {e}")
-    raise e
+def get_collection():
+    """The resumes_db collection (indexes are created by app.migrations)."""
+    return clients.mongo()["capybara_db"]["resumes_db"]
+
+def get_jobs() -> JobStore:
+    return clients.get("ingestion_jobs", lambda: JobStore(clients.mongo()["capybara_db"]["ingestion_jobs"]))
 
 class ProcessingResponse(BaseModel):
     total_files_processed: int
     successful_files: List[str]
     failed_files: List[Dict[str, str]]  # filename and error message
     total_pages_processed: int
+    failed_documents: List[Dict[str, str]] = []  # filename, page and error message
+    added_files: List[str] = []
+    updated_files: List[str] = []
+    unchanged_files: List[str] = []
+    removed_files: List[str] = []
 
 # def extract_pdf_content(pdf_path: str) -> List[Dict]:
 #     """Extract text and metadata from PDF."""
@@ -69,72 +61,6 @@ class ProcessingResponse(BaseModel):
 #     except Exception as e:
 #         raise Exception(f"Error processing {pdf_path}: {str(e)}")
 
-def split_text_into_chunks(text: str, chunk_size: int = 500) -> List[str]:
-    """
-    Split text into smaller chunks of a specified size.
-    Args:
-        text (str): The text to split.
-        chunk_size (int): Maximum number of characters per chunk.
-    Returns:
-        List[str]: List of text chunks.
-    """
-    chunks = []
-    for i in range(0, len(text), chunk_size):
-        chunks.append(text[i:i + chunk_size])
-    return chunks
-
-def extract_pdf_content(pdf_path: str, chunk_size: int = 500) -> Dict:
-    """
-    Extract text and metadata from PDF, split text into chunks, and structure the output.
-    Args:
-        pdf_path (str): Path to the PDF file.
-        chunk_size (int): Maximum number of characters per chunk.
-    Returns:
-        Dict: Structured metadata and content.
-    """
-    try:
-        with open(pdf_path, 'rb') as file:
-            pdf = PdfReader(file)
-            metadata = {
-                "metadata_id": 1,  # You can generate a unique ID here
-                "file_name": os.path.basename(pdf_path),
-                "total_pages": len(pdf.pages),
-                "source": "resume"
-            }
-            content = []
-            chunk_counter = 1  # To track chunk numbers across pages
-
-            for page_num in range(len(pdf.pages)):
-                page = pdf.pages[page_num]
-                text = page.extract_text()
-
-                if text.strip():
-                    # Split the page text into smaller chunks
-                    chunks = split_text_into_chunks(text, chunk_size)
-
-                    for chunk_text in chunks:
-                        content.append({
-                            "page_num": page_num + 1,  # Page numbers start from 1
-                            "chunk_number": chunk_counter,
-                            "chunk_text": chunk_text
-                        })
-                        chunk_counter += 1  # Increment chunk counter
-
-            # Structure the result
-            result = {
-                "metadata": metadata,
-                "content": content
-            }
-
-            # Print the extracted content in JSON format
-            print("Extracted PDF Content (JSON Format):")
-            print(json.dumps(result, indent=4))  # Pretty-print JSON
-            return result
-
-    except Exception as e:
-        print(f"Error processing {pdf_path}: {str(e)}")
-        return {}
-
 # @router.post("/process-cv-folder", response_model=ProcessingResponse)
 # async def process_cv_folder():
 #     """Process all PDFs in the cv folder."""
@@ -201,107 +127,123 @@ def extract_pdf_content(pdf_path: str, chunk_size: int = 500) -> Dict:
 #     except Exception as e:
 #         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/process-cv-folder", response_model=ProcessingResponse)
-async def process_cv_folder():
-    """Process all PDFs in the cv folder."""
-    cv_folder = "app/cv"  # Folder at same level as main.py
-    
-    if not os.path.exists(cv_folder):
+CV_FOLDER = "app/cv"  # Folder at same level as main.py
+
+def _ensure_cv_folder():
+    if not os.path.exists(CV_FOLDER):
         raise HTTPException(
             status_code=404,
-            detail=f"CV folder '{cv_folder}' not found!"
+            detail=f"CV folder '{CV_FOLDER}' not found!"
         )
+
+async def _reindex_cv_folder(
+    batch_size: int,
+    full_rebuild: bool,
+    progress: Optional[ProgressCallback] = None
+) -> ProcessingResponse:
+    collection = get_collection()
+    report = await reindex_folder(
+        CV_FOLDER, collection, clients.embeddings(), extract_chunk_documents,
+        batch_size=batch_size, full_rebuild=full_rebuild, progress=progress,
+        pipeline_version=CHUNKER_VERSION
+    )
+    
+    # Keep the local vector index (if used) in step with the collection
+    if full_rebuild or report["added_files"] or report["updated_files"] or report["removed_files"]:
+        await asyncio.to_thread(get_vector_retriever(collection).refresh)
     
-    successful_files = []
-    failed_files = []
-    total_pages = 0
-    processed_count = 0
+    successful_files = report["added_files"] + report["updated_files"]
+    return ProcessingResponse(
+        total_files_processed=len(successful_files) + len(report["failed_files"]),
+        successful_files=successful_files,
+        **report
+    )
+
+def _reindex_job(batch_size: int, full_rebuild: bool):
+    async def run(progress: ProgressCallback) -> Dict:
+        result = await _reindex_cv_folder(batch_size, full_rebuild, progress)
+        return result.model_dump()
+    return run
+
+def _already_running(e: JobAlreadyRunning) -> HTTPException:
+    return HTTPException(status_code=409, detail=f"Re-index job {e.job['job_id']} is already {e.job['status']}")
+
+@router.post("/process-cv-folder", response_model=ProcessingResponse)
+async def process_cv_folder(
+    batch_size: int = Query(EMBEDDING_BATCH_SIZE, ge=1, le=100, description="Chunks per embedding call and bulk insert"),
+    full_rebuild: bool = Query(False, description="Drop the collection and re-index every file")
+):
+    """Incrementally re-index the cv folder within this request. Prefer POST /pdf-omar/jobs for large folders."""
+    _ensure_cv_folder()
     
+    # Runs as a job too, so it cannot overlap a background re-index of the same collection
     try:
-        # Clear existing collection
-        collection.delete_many({})
-        
-        # Process each PDF in the cv folder
-        for filename in os.listdir(cv_folder):
-            if filename.endswith(".pdf"):
-                pdf_path = os.path.join(cv_folder, filename)
-                print(f"Processing {filename}...")
-                
-                try:
-                    # Extract content from the PDF
-                    result = extract_pdf_content(pdf_path)
-                    
-                    if result:  # Check if result is not empty
-                        metadata = result["metadata"]
-                        content = result["content"]
-                        
-                        # Process each chunk in the content
-                        for chunk in content:
-                            try:
-                                # Generate embedding for the chunk text
-                                embedding = embeddings.embed_query(chunk["chunk_text"])
-                                
-                                # Store document with embedding as a regular array
-                                mongo_doc = {
-                                    "text": chunk["chunk_text"],
-                                    "metadata": metadata,
-                                    "chunk_number": chunk["chunk_number"],  # Add chunk_number
-                                    "page_number": chunk["page_num"],       # Add page_number
-                                    "embedding_array": embedding  # Store as regular array
-                                }
-                                
-                                # Insert into MongoDB
-                                collection.insert_one(mongo_doc)
-                                processed_count += 1
-                                print(f"Processed document {processed_count} from {filename}")
-                                
-                            except Exception as e:
-                                print(f"Error processing chunk from {filename}: {str(e)}")
-                                continue
-                        
-                        successful_files.append(filename)
-                        total_pages += len(content)  # Update total pages processed
-                    
-                except Exception as e:
-                    failed_files.append({
-                        "filename": filename,
-                        "error": str(e)
-                    })
-                    print(f"Error processing {filename}: {str(e)}")
-        
-        return ProcessingResponse(
-            total_files_processed=len(successful_files) + len(failed_files),
-            successful_files=successful_files,
-            failed_files=failed_files,
-            total_pages_processed=total_pages
-        )
-        
+        return await run_job(get_jobs(), "pdf-omar", _reindex_job(batch_size, full_rebuild), {"batch_size": batch_size, "full_rebuild": full_rebuild})
+    except JobAlreadyRunning as e:
+        raise _already_running(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/jobs", response_model=IngestionJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def submit_reindex_job(
+    batch_size: int = Query(EMBEDDING_BATCH_SIZE, ge=1, le=100, description="Chunks per embedding call and bulk insert"),
+    full_rebuild: bool = Query(False, description="Drop the collection and re-index every file")
+):
+    """Start re-indexing the cv folder in the background and return the job to poll."""
+    _ensure_cv_folder()
+    
+    try:
+        return submit_job(get_jobs(), "pdf-omar", _reindex_job(batch_size, full_rebuild), {"batch_size": batch_size, "full_rebuild": full_rebuild})
+    except JobAlreadyRunning as e:
+        raise _already_running(e)
+
+@router.get("/jobs", response_model=List[IngestionJobResponse])
+def list_reindex_jobs(limit: int = Query(20, ge=1, le=100)):
+    """List the most recent re-index jobs."""
+    return get_jobs().list("pdf-omar", limit)
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+def get_reindex_job(job_id: str):
+    """Report progress of a re-index job: files done, pages embedded, throughput and errors."""
+    job = get_jobs().get(job_id)
+    if job is None or job["kind"] != "pdf-omar":
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @router.get("/status")
 async def get_database_status():
     """Get the current status of the resume database."""
     try:
+        collection = get_collection()
         total_documents = collection.count_documents({})
         unique_resumes = len(collection.distinct("metadata.file_name"))
         
         return {
             "total_documents": total_documents,
             "unique_resumes": unique_resumes,
+            "embedding_cache": clients.embeddings().stats(),
             "status": "active"
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _clear_collection() -> int:
+    collection = get_collection()
+    result = collection.delete_many({})
+    IngestionManifest(collection).clear()
+    bump_corpus_version(collection)
+    get_vector_retriever(collection).refresh()
+    return result.deleted_count
+
 @router.delete("/clear-database")
 async def clear_database():
     """Clear all documents from the database."""
     try:
-        result = collection.delete_many({})
+        # The deletes and the local vector index rebuild block; keep them off the event loop
+        documents_deleted = await asyncio.to_thread(_clear_collection)
         return {
             "status": "success",
-            "documents_deleted": result.deleted_count,
+            "documents_deleted": documents_deleted,
             "message": "Database cleared successfully"
         }
     except Exception as e:
@@ -1,13 +1,8 @@
 from fastapi import APIRouter, File, UploadFile, HTTPException
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
 import os
-import io
+import asyncio
 import logging
-import requests
+from ..uploads import check_upload_size
 
 router = APIRouter(prefix="/upload-pdf", tags=["PDF Storage"])
 
@@ -24,23 +19,28 @@ async def upload_pdf(file: UploadFile = File(...)):
         if file.content_type not in ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]:
             raise HTTPException(status_code=400, detail="Invalid file type. Only PDF and DOCX files are allowed.")
 
-        # Read the file content
-        file_content = await file.read()
+        import requests
+
+        # Stream the spooled upload instead of reading it into memory
+        size = check_upload_size(file)
+        file.file.seek(0)
 
         # Upload the file to Google Drive
         upload_url = f"https://www.googleapis.com/upload/drive/v3/files?uploadType=media&supportsAllDrives=true&fields=id"
         headers = {
             "Authorization": "Bearer YOUR_ACCESS_TOKEN",  # Replace with a valid access token
             "Content-Type": file.content_type,
+            "Content-Length": str(size),
         }
         data = {
             "name": file.filename,
             "parents": [FOLDER_ID],
         }
-        response = requests.post(
+        response = await asyncio.to_thread(
+            requests.post,
             upload_url,
             headers=headers,
-            data=file_content,
+            data=file.file,
             json=data,
         )
 
@@ -50,6 +50,8 @@ async def upload_pdf(file: UploadFile = File(...)):
         # Return the file ID
         return {"file_id": response.json().get('id'), "file_name": file.filename}
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in upload_pdf: {e}")
         raise HTTPException(status_code=500, detail=str(e))
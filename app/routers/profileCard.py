@@ -1,54 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import select
-from typing import List
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import List, Optional
+from ..database import get_async_db, AsyncSessionLocal
 from ..models import ProjectAssignment, Project, Talent, Department, TalentSkill, Skill
 from ..schemas.profileCard import (
     ProjectTeamMemberResponse,
     AvailableTalentResponse
 )
+from ..pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_key_cursor
 
 router = APIRouter(prefix="/profile-card", tags=["Profile Card"])
+
+
+def _skill_names_column():
+    """Correlated subquery aggregating each talent's skill names into a single array column"""
+    return (
+        select(func.array_agg(Skill.skill_name))
+        .select_from(TalentSkill)
+        .join(Skill, Skill.skill_id == TalentSkill.skill_id)
+        .where(TalentSkill.talent_id == Talent.talent_id)
+        .correlate(Talent)
+        .scalar_subquery()
+        .label('skills')
+    )
+
                    
 # To be used for getting all members of an assigned project 
 @router.get("/project/{project_id}/team", response_model=List[ProjectTeamMemberResponse])
-def get_project_team(project_id: int, db: Session = Depends(get_db)):
+async def get_project_team(project_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get all team members assigned to a specific project with essential information"""
     # First check if project exists
-    project = db.query(Project).filter(Project.project_id == project_id).first()
-    if not project:
+    project_exists = await db.scalar(select(Project.project_id).where(Project.project_id == project_id))
+    if project_exists is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    # Get team members with their department information
-    team_members = (
-        db.query(
+    # Get team members with their department information and skills in a single query
+    team_members = (await db.execute(
+        select(
             Talent,
             Department.department_name.label('department_name'),
             ProjectAssignment.role,
             ProjectAssignment.performance_rating,
             ProjectAssignment.assignment_start_date,
-            ProjectAssignment.assignment_end_date
+            ProjectAssignment.assignment_end_date,
+            _skill_names_column()
         )
         .join(ProjectAssignment, ProjectAssignment.talent_id == Talent.talent_id)
         .join(Department, Department.department_id == Talent.department_id)
-        .filter(ProjectAssignment.project_id == project_id)
-        .all()
-    )
+        .where(ProjectAssignment.project_id == project_id)
+    )).all()
     
     # Transform the results to match the response schema
     result = []
     for (talent, department_name, role, performance_rating, 
-         assignment_start_date, assignment_end_date) in team_members:
-        
-        # Get skills for this talent
-        talent_skills = (
-            db.query(Skill.skill_name)
-            .join(TalentSkill, TalentSkill.skill_id == Skill.skill_id)
-            .filter(TalentSkill.talent_id == talent.talent_id)
-            .all()
-        )
-        
+         assignment_start_date, assignment_end_date, skills) in team_members:
         team_member_dict = {
             "talent_id": talent.talent_id,
             "first_name": talent.first_name,
@@ -63,17 +70,15 @@ def get_project_team(project_id: int, db: Session = Depends(get_db)):
             "assignment_start_date": assignment_start_date,
             "assignment_end_date": assignment_end_date,
             "total_experience_years": talent.total_experience_years,
-            "skills": [skill[0] for skill in talent_skills]  # Extract skill names from result tuples
+            "skills": skills or []  # array_agg returns NULL for talents without skills
         }
         result.append(team_member_dict)
     
     return result
     
 
-#To be used to see what members are available to be assigned to a project
-@router.get("/available-talents/{project_id}", response_model=List[AvailableTalentResponse])
-def get_available_talents(project_id: int, db: Session = Depends(get_db)):
-    """Get all talents not assigned to the specified project with complete information"""
+async def _available_talents_page(db: AsyncSession, project_id: int, after_id: Optional[int], limit: int):
+    """Fetch one keyset page of talents not assigned to the project, ordered by talent_id"""
     # Get IDs of talents already assigned to the project
     assigned_talents = (
         select(ProjectAssignment.talent_id)
@@ -81,40 +86,82 @@ def get_available_talents(project_id: int, db: Session = Depends(get_db)):
         .scalar_subquery()
     )
 
-    # Query talents not in the project with all their information
-    available_talents = (
-        db.query(
+    # Skills are aggregated per row, so each page costs a single query
+    query = (
+        select(
             Talent,
-            Department.department_name.label('department_name')
+            Department.department_name.label('department_name'),
+            _skill_names_column()
         )
         .join(Department, Department.department_id == Talent.department_id)
-        .filter(~Talent.talent_id.in_(assigned_talents))
-        .all()
+        .where(~Talent.talent_id.in_(assigned_talents))
     )
-    
-    # Transform the results to match the response schema
-    result = []
-    for talent, department_name in available_talents:
-        # Get skills for this talent
-        talent_skills = (
-            db.query(Skill.skill_name)
-            .join(TalentSkill, TalentSkill.skill_id == Skill.skill_id)
-            .filter(TalentSkill.talent_id == talent.talent_id)
-            .all()
+    if after_id is not None:
+        query = query.where(Talent.talent_id > after_id)
+
+    result = await db.execute(query.order_by(Talent.talent_id).limit(limit))
+    return result.all()
+
+
+def _available_talent_dict(talent: Talent, department_name: Optional[str], skills: Optional[List[str]]):
+    return {
+        "talent_id": talent.talent_id,
+        "first_name": talent.first_name,
+        "last_name": talent.last_name,
+        "email": talent.email,
+        "basic_salary": talent.basic_salary,
+        "phone": talent.phone,
+        "job_title": talent.job_title,
+        "department_name": department_name,
+        "total_experience_years": talent.total_experience_years,
+        "skills": skills or []
+    }
+
+
+async def _stream_available_talents(project_id: int, after_id: Optional[int], page_size: int):
+    """Yield every available talent as NDJSON, holding at most one page in memory"""
+    # The request-scoped session is closed before a streamed body is sent, so use our own
+    db = AsyncSessionLocal()
+    try:
+        while True:
+            rows = await _available_talents_page(db, project_id, after_id, page_size)
+            for talent, department_name, skills in rows:
+                item = AvailableTalentResponse(**_available_talent_dict(talent, department_name, skills))
+                yield item.model_dump_json() + "\n"
+            if len(rows) < page_size:
+                break
+            after_id = rows[-1][0].talent_id
+            db.expunge_all()
+    finally:
+        await db.close()
+
+
+#To be used to see what members are available to be assigned to a project
+@router.get("/available-talents/{project_id}", response_model=List[AvailableTalentResponse])
+async def get_available_talents(
+    project_id: int,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor taken from the X-Next-Cursor header of the previous page"),
+    limit: int = Query(100, ge=1, le=1000, description="Page size (also the fetch size when streaming)"),
+    stream: bool = Query(False, description="Stream all remaining talents as NDJSON instead of returning one page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get talents not assigned to the specified project, one keyset page at a time"""
+    after_id = decode_key_cursor(cursor)
+
+    if stream:
+        return StreamingResponse(
+            _stream_available_talents(project_id, after_id, limit),
+            media_type="application/x-ndjson"
         )
-        
-        talent_dict = {
-            "talent_id": talent.talent_id,
-            "first_name": talent.first_name,
-            "last_name": talent.last_name,
-            "email": talent.email,
-            "basic_salary": talent.basic_salary,
-            "phone": talent.phone,
-            "job_title": talent.job_title,
-            "department_name": department_name,
-            "total_experience_years": talent.total_experience_years,
-            "skills": [skill[0] for skill in talent_skills]  # Extract skill names from result tuples
-        }
-        result.append(talent_dict)
-    
-    return result
\ No newline at end of file
+
+    rows = await _available_talents_page(db, project_id, after_id, limit)
+
+    # A full page means there may be more; hand back the last key as the next cursor
+    if len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1][0].talent_id)
+
+    return [
+        _available_talent_dict(talent, department_name, skills)
+        for talent, department_name, skills in rows
+    ]
@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
-from ..database import get_db
+from ..database import get_db, get_async_db
+from ..pagination import KeysetPage, estimated_count
 from ..models import Project
 from ..schemas.project import ProjectBase, ProjectResponse
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
+# Reads go through the async engine; writes stay on the sync session
 @router.get("/", response_model=List[ProjectResponse])
-def get_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(Project).offset(skip).limit(limit).all()
+async def get_projects(response: Response, page: KeysetPage = Depends(), db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(page.apply(select(Project), Project.project_id))
+    projects = result.scalars().all()
+    total = await db.run_sync(estimated_count, Project) if page.include_total else None
+    page.set_headers(response, projects, Project.project_id, total)
+    return projects
 
 @router.get("/{project_id}", response_model=ProjectResponse)
-def get_project(project_id: int, db: Session = Depends(get_db)):
-    project = db.query(Project).filter(Project.project_id == project_id).first()
+async def get_project(project_id: int, db: AsyncSession = Depends(get_async_db)):
+    project = await db.get(Project, project_id)
     if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
+from ..pagination import KeysetPage, estimated_count
 from ..models import ProjectAssignment, Project, Talent
 from ..schemas.projectassignments import (
     ProjectAssignmentCreate,
@@ -12,8 +14,10 @@ from ..schemas.projectassignments import (
 router = APIRouter(prefix="/project-assignments", tags=["project-assignments"])
 
 @router.get("/", response_model=List[ProjectAssignmentResponse])
-def get_all_project_assignments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(ProjectAssignment).offset(skip).limit(limit).all()
+def get_all_project_assignments(response: Response, page: KeysetPage = Depends(), db: Session = Depends(get_db)):
+    assignments = page.apply(db.query(ProjectAssignment), ProjectAssignment.assignment_id).all()
+    page.set_headers(response, assignments, ProjectAssignment.assignment_id, estimated_count(db, ProjectAssignment) if page.include_total else None)
+    return assignments
 
 
 @router.post("/", response_model=ProjectAssignmentResponse)
@@ -29,18 +33,14 @@ def create_project_assignment(
     if not project or not talent:
         raise HTTPException(status_code=404, detail="Project or Talent not found")
     
-    # Check if assignment already exists
-    existing_assignment = db.query(ProjectAssignment).filter(
-        ProjectAssignment.project_id == assignment.project_id,
-        ProjectAssignment.talent_id == assignment.talent_id
-    ).first()
-    
-    if existing_assignment:
-        raise HTTPException(status_code=400, detail="Assignment already exists")
-    
+    # The unique (project_id, talent_id) constraint rejects duplicates, including concurrent ones
     new_assignment = ProjectAssignment(**assignment.model_dump())
     db.add(new_assignment)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Assignment already exists")
     db.refresh(new_assignment)
     return new_assignment
 
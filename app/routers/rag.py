@@ -1,30 +1,26 @@
-from fastapi import APIRouter, HTTPException
-from pymongo import MongoClient
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_google_genai.embeddings import GoogleGenerativeAIEmbeddings
+from fastapi import APIRouter, HTTPException, Query
 import os
-import certifi
-from typing import List, Dict
+from typing import List, Dict, Optional
+from ..retrieval import hybrid_search
+from ..cache import ResponseCache
+from ..clients import clients
+from ..concurrency import run_blocking
+from ..context_builder import build_context
+from ..ingestion import corpus_version
+from ..streaming import replay_answer, sse_response, stream_llm_answer
 
 router = APIRouter(prefix="/rag", tags=["Team Assembly"])
 
-# Initialize clients and models
-try:
-    client = MongoClient(
-        os.getenv("MONGODB_ATLAS_CLUSTER_URI"),
-        tlsCAFile=certifi.where()
-    )
-    
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-1.5-flash",
-        temperature=0.7
-    )
-    
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-    
-except Exception as e:
-    print(f"Initialization error: {e}")
-    raise e
+TEAM_CACHE_SIZE = int(os.getenv("TEAM_CACHE_SIZE", "256"))
+TEAM_CACHE_TTL = float(os.getenv("TEAM_CACHE_TTL", "3600"))
+# Cosine similarity above which differently worded requirements reuse an answer; unset means exact matches only
+TEAM_CACHE_SIMILARITY = float(os.getenv("TEAM_CACHE_SIMILARITY")) if os.getenv("TEAM_CACHE_SIMILARITY") else None
+
+# One cache per endpoint, since they format sources differently
+team_caches = {
+    name: ResponseCache(TEAM_CACHE_SIZE, TEAM_CACHE_TTL, TEAM_CACHE_SIMILARITY)
+    for name in ("kai", "omar")
+}
 
 SYSTEM_PROMPT = """
 You are CapybarAI, a team assembly assistant. Your task is to:
@@ -67,21 +63,28 @@ Team Dynamics:
 [Explain how the team members complement each other and why they would work well together]
 """
 
-def find_similar_resumes(query: str, limit: int = 5) -> List[Dict]:
-    """Find similar resumes using text search and embedding similarity."""
-    collection = client["capybara_db"]["resumes"]
+def find_similar_resumes(query: str, limit: int = 5, query_embedding: Optional[List[float]] = None) -> List[Dict]:
+    """Find similar resumes by fusing text search and embedding similarity rankings."""
+    collection = clients.mongo()["capybara_db"]["resumes"]
     
-    query_embedding = embeddings.embed_query(query)
+    if query_embedding is None:
+        query_embedding = clients.embeddings().embed_query(query)
     
-    results = collection.find(
-        {"$text": {"$search": query}},
-        {"score": {"$meta": "textScore"}}
-    ).sort([("score", {"$meta": "textScore"})]).limit(limit)
-    
-    return list(results)
+    return hybrid_search(collection, query, query_embedding, limit=limit)
+
+async def lookup_team_recommendation(cache: ResponseCache, project_requirements: str):
+    """Return (corpus version, query embedding or None, cached answer or None) for a team request."""
+    version = await run_blocking(corpus_version, clients.mongo()["capybara_db"]["resumes"])
+    query_embedding = None
+    if cache.similarity_threshold is not None:
+        query_embedding = await run_blocking(clients.embeddings().embed_query, project_requirements)
+    return version, query_embedding, cache.get(project_requirements, version, query_embedding)
 
 @router.get("/assemble-team/kai")
-async def assemble_team(project_requirements: str):
+async def assemble_team(
+    project_requirements: str,
+    stream: bool = Query(False, description="Stream the answer as server-sent events: sources first, then tokens")
+):
     try:
         if not project_requirements:
             raise HTTPException(
@@ -89,25 +92,56 @@ async def assemble_team(project_requirements: str):
                 detail="Project requirements are required"
             )
         
-        relevant_resumes = find_similar_resumes(project_requirements)
+        cache = team_caches["kai"]
+        version, query_embedding, cached = await lookup_team_recommendation(cache, project_requirements)
+        if cached is not None:
+            if stream:
+                return sse_response(replay_answer(cached["team_recommendation"], {
+                    "project_requirements": project_requirements,
+                    "sources": cached["sources"],
+                    "context_usage": cached["context_usage"]
+                }))
+            return {"project_requirements": project_requirements, **cached}
+        
+        relevant_resumes = await run_blocking(find_similar_resumes, project_requirements, query_embedding=query_embedding)
         
-        context = "\n\nAvailable Candidates:\n"
-        for resume in relevant_resumes:
-            context += f"Candidate from {resume['metadata']['file_name']}:\n{resume['text']}\n\n"
+        candidates, relevant_resumes, context_usage = build_context(
+            relevant_resumes, lambda resume: f"Candidate from {resume['metadata']['file_name']}:"
+        )
+        context = "\n\nAvailable Candidates:\n" + candidates
         
         prompt = f"{SYSTEM_PROMPT}\n\nProject Requirements:\n{project_requirements}\n{context}"
-        response = llm.predict(prompt)
+        sources = [
+            {
+                "file_name": resume["metadata"]["file_name"],
+                "page_number": resume["metadata"]["page_number"],
+                "score": resume["score"]
+            }
+            for resume in relevant_resumes
+        ]
+        
+        def remember(response: str) -> None:
+            cache.set(project_requirements, version, {
+                "team_recommendation": response,
+                "sources": sources,
+                "context_usage": context_usage
+            }, query_embedding)
+        
+        if stream:
+            return sse_response(stream_llm_answer(clients.llm(), prompt, {
+                "project_requirements": project_requirements,
+                "sources": sources,
+                "context_usage": context_usage
+            }, on_complete=remember))
+        
+        response = await run_blocking(clients.llm().predict, prompt)
+        remember(response)
         
         return {
             "project_requirements": project_requirements,
             "team_recommendation": response,
-            "sources": [
-                {
-                    "file_name": resume["metadata"]["file_name"],
-                    "page_number": resume["metadata"]["page_number"]
-                }
-                for resume in relevant_resumes
-            ]
+            "sources": sources,
+            "context_usage": context_usage
         }
 
     except Exception as e:
@@ -115,7 +149,10 @@ async def assemble_team(project_requirements: str):
 
 
 @router.get("/assemble-team/omar")
-async def assemble_team(project_requirements: str):
+async def assemble_team(
+    project_requirements: str,
+    stream: bool = Query(False, description="Stream the answer as server-sent events: sources first, then tokens")
+):
     try:
         if not project_requirements:
             raise HTTPException(
@@ -123,25 +160,56 @@ async def assemble_team(project_requirements: str):
                 detail="Project requirements are required"
             )
         
-        relevant_resumes = find_similar_resumes(project_requirements)
+        cache = team_caches["omar"]
+        version, query_embedding, cached = await lookup_team_recommendation(cache, project_requirements)
+        if cached is not None:
+            if stream:
+                return sse_response(replay_answer(cached["team_recommendation"], {
+                    "project_requirements": project_requirements,
+                    "sources": cached["sources"],
+                    "context_usage": cached["context_usage"]
+                }))
+            return {"project_requirements": project_requirements, **cached}
+        
+        relevant_resumes = await run_blocking(find_similar_resumes, project_requirements, query_embedding=query_embedding)
         
-        context = "\n\nAvailable Candidates:\n"
-        for resume in relevant_resumes:
-            context += f"Candidate from {resume['metadata']['file_name']}:\n{resume['text']}\n\n"
+        candidates, relevant_resumes, context_usage = build_context(
+            relevant_resumes, lambda resume: f"Candidate from {resume['metadata']['file_name']}:"
+        )
+        context = "\n\nAvailable Candidates:\n" + candidates
         
         prompt = f"{SYSTEM_PROMPT}\n\nProject Requirements:\n{project_requirements}\n{context}"
-        response = llm.predict(prompt)
+        sources = [
+            {
+                "file_name": resume["metadata"]["file_name"],
+                "page_number": resume.get("page_number", "N/A"),  # Use get to avoid KeyError
+                "score": resume["score"]
+            }
+            for resume in relevant_resumes
+        ]
+        
+        def remember(response: str) -> None:
+            cache.set(project_requirements, version, {
+                "team_recommendation": response,
+                "sources": sources,
+                "context_usage": context_usage
+            }, query_embedding)
+        
+        if stream:
+            return sse_response(stream_llm_answer(clients.llm(), prompt, {
+                "project_requirements": project_requirements,
+                "sources": sources,
+                "context_usage": context_usage
+            }, on_complete=remember))
+        
+        response = await run_blocking(clients.llm().predict, prompt)
+        remember(response)
         
         return {
             "project_requirements": project_requirements,
             "team_recommendation": response,
-            "sources": [
-                {
-                    "file_name": resume["metadata"]["file_name"],
-                    "page_number": resume.get("page_number", "N/A")  # Use get to avoid KeyError
-                }
-                for resume in relevant_resumes
-            ]
+            "sources": sources,
+            "context_usage": context_usage
         }
 
     except Exception as e:
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
+from ..pagination import KeysetPage, estimated_count
 from ..models import Skill
 from ..schemas.skill import SkillCreate, SkillResponse, SkillUpdate
 
 router = APIRouter(prefix="/skills", tags=["skills"])
 
 @router.get("/", response_model=List[SkillResponse])
-def get_skills(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(Skill).offset(skip).limit(limit).all()
+def get_skills(response: Response, page: KeysetPage = Depends(), db: Session = Depends(get_db)):
+    skills = page.apply(db.query(Skill), Skill.skill_id).all()
+    page.set_headers(response, skills, Skill.skill_id, estimated_count(db, Skill) if page.include_total else None)
+    return skills
 
 @router.get("/{skill_id}", response_model=SkillResponse)
 def get_skill(skill_id: int, db: Session = Depends(get_db)):
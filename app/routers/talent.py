@@ -1,19 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
-from ..models import Talent
-from ..schemas.talent import TalentBase, TalentResponse, TalentUpdate
+from typing import Any, Dict, List
+from ..database import get_db, get_async_db
+from ..pagination import KeysetPage, estimated_count
+from ..bulk import check_row_count, existing_keys, failed, validate_rows, write_rows, bulk_response
+from ..models import Department, Talent
+from ..schemas.talent import TalentBase, TalentResponse, TalentUpdate, BulkTalentResponse
 
 router = APIRouter(prefix="/talents", tags=["talents"])
 
+# Reads go through the async engine; writes stay on the sync session
 @router.get("/", response_model=List[TalentResponse])
-def get_talents(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(Talent).offset(skip).limit(limit).all()
+async def get_talents(response: Response, page: KeysetPage = Depends(), db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(page.apply(select(Talent), Talent.talent_id))
+    talents = result.scalars().all()
+    total = await db.run_sync(estimated_count, Talent) if page.include_total else None
+    page.set_headers(response, talents, Talent.talent_id, total)
+    return talents
 
 @router.get("/{talent_id}", response_model=TalentResponse)
-def get_talent(talent_id: int, db: Session = Depends(get_db)):
-    talent = db.query(Talent).filter(Talent.talent_id == talent_id).first()
+async def get_talent(talent_id: int, db: AsyncSession = Depends(get_async_db)):
+    talent = await db.get(Talent, talent_id)
     if talent is None:
         raise HTTPException(status_code=404, detail="Talent not found")
     return talent
@@ -34,6 +43,43 @@ def create_talent(talent: TalentBase, db: Session = Depends(get_db)):
     return new_talent
 
 
+@router.post("/bulk", response_model=BulkTalentResponse)
+def bulk_create_talents(
+    rows: List[Dict[str, Any]] = Body(..., description="Talents with the same fields as POST /talents/; each row is validated and reported on its own"),
+    upsert: bool = Query(False, description="Update talents whose email already exists instead of skipping them; only the fields a row sends are overwritten (send null to clear one)"),
+    db: Session = Depends(get_db)
+):
+    """Create many talents in a few statements, keyed on email, with an outcome per row"""
+    check_row_count(rows)
+    results: Dict[int, Dict[str, Any]] = {}
+    valid = validate_rows(rows, TalentBase, results)
+
+    # One query for every department referenced by the request
+    departments = existing_keys(db, Department.department_id, (t.department_id for _, t in valid if t.department_id is not None))
+
+    first_row_for_email: Dict[str, int] = {}
+    to_write = []
+    for index, talent in valid:
+        if talent.department_id is not None and talent.department_id not in departments:
+            results[index] = failed(index, f"Department {talent.department_id} not found", email=talent.email)
+        elif talent.email in first_row_for_email:
+            results[index] = failed(index, f"Duplicate email, already in row {first_row_for_email[talent.email]}", email=talent.email)
+        else:
+            first_row_for_email[talent.email] = index
+            to_write.append((index, talent.model_dump(exclude_unset=True)))
+
+    results.update(write_rows(db, Talent.__table__, to_write, ["email"], upsert, returning=["talent_id"]))
+
+    # Skipped rows already exist; report the talent they matched
+    skipped = {result["email"]: result for result in results.values() if result["status"] == "skipped"}
+    if skipped:
+        for talent_id, email in db.query(Talent.talent_id, Talent.email).filter(Talent.email.in_(list(skipped))):
+            skipped[email]["talent_id"] = talent_id
+
+    db.commit()
+    return bulk_response(results)
+
+
 @router.put("/{talent_id}", response_model=TalentResponse)
 def update_talent(talent_id: int, talent: TalentUpdate, db: Session = Depends(get_db)):
     db_talent = db.query(Talent).filter(Talent.talent_id == talent_id).first()
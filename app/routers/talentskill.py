@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List
 from datetime import datetime
 from ..database import get_db
 from ..models.talent import Talent
 from ..models.skill import Skill
 from ..models.talentskill import TalentSkill
 from ..schemas import talentskill as schemas
+from ..bulk import check_row_count, existing_keys, failed, validate_rows, write_rows, bulk_response
 
 router = APIRouter(
     prefix="/talentskills",
@@ -48,6 +49,44 @@ def create_talent_skill(talent_skill: schemas.TalentSkillCreate, db: Session = D
     db.refresh(db_talent_skill)
     return db_talent_skill
 
+@router.post("/bulk", response_model=schemas.BulkTalentSkillResponse)
+def bulk_create_talent_skills(
+    rows: List[Dict[str, Any]] = Body(..., description="Talent skills with the same fields as POST /talentskills/; each row is validated and reported on its own"),
+    upsert: bool = Query(False, description="Update existing (talent_id, skill_id) rows instead of skipping them; only the fields a row sends are overwritten"),
+    db: Session = Depends(get_db)
+):
+    """Create many talent skills in a few statements, with an outcome per row"""
+    check_row_count(rows)
+    results: Dict[int, Dict[str, Any]] = {}
+    valid = validate_rows(rows, schemas.TalentSkillCreate, results)
+
+    # One query per referenced table instead of two lookups per row
+    talents = existing_keys(db, Talent.talent_id, (row.talent_id for _, row in valid))
+    skills = existing_keys(db, Skill.skill_id, (row.skill_id for _, row in valid))
+
+    first_row_for_key: Dict[tuple, int] = {}
+    to_write = []
+    for index, row in valid:
+        key = (row.talent_id, row.skill_id)
+        ids = {"talent_id": row.talent_id, "skill_id": row.skill_id}
+        if row.talent_id not in talents:
+            results[index] = failed(index, "Talent not found", **ids)
+        elif row.skill_id not in skills:
+            results[index] = failed(index, "Skill not found", **ids)
+        elif not 1 <= row.proficiency_level <= 5:
+            results[index] = failed(index, "Proficiency level must be between 1 and 5", **ids)
+        elif row.years_of_experience < 0:
+            results[index] = failed(index, "Years of experience cannot be negative", **ids)
+        elif key in first_row_for_key:
+            results[index] = failed(index, f"Duplicate talent skill, already in row {first_row_for_key[key]}", **ids)
+        else:
+            first_row_for_key[key] = index
+            to_write.append((index, row.model_dump(exclude_unset=True)))
+
+    results.update(write_rows(db, TalentSkill.__table__, to_write, ["talent_id", "skill_id"], upsert))
+    db.commit()
+    return bulk_response(results)
+
 @router.get("/talent/{talent_id}/skill/{skill_id}", response_model=schemas.TalentSkillResponse)
 def get_talent_skill(talent_id: int, skill_id: int, db: Session = Depends(get_db)):
     db_talent_skill = db.query(TalentSkill).filter(
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
+from ..pagination import KeysetPage, estimated_count
 from ..models import User
 from ..schemas.user import UserCreate, UserUpdate, UserResponse, UserSignup, UserLogin
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.get("/", response_model=List[UserResponse])
-def get_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(User).offset(skip).limit(limit).all()
+def get_users(response: Response, page: KeysetPage = Depends(), db: Session = Depends(get_db)):
+    users = page.apply(db.query(User), User.user_id).all()
+    page.set_headers(response, users, User.user_id, estimated_count(db, User) if page.include_total else None)
+    return users
 
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(user_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+# Background re-indexing job as reported by GET /pdf/jobs/{job_id}
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str  # queued, running, completed or failed
+    params: Dict[str, Any] = {}
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    files_total: int = 0
+    files_done: int = 0
+    pages_embedded: int = 0
+    pages_per_second: float = 0.0
+    errors: List[Dict[str, str]] = []
+    result: Optional[Dict[str, Any]] = None  # ProcessingResponse once completed
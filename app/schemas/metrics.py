@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+
+# Checkout wait times; buckets are cumulative counts keyed by upper bound in seconds, plus "+Inf"
+class WaitHistogram(BaseModel):
+    count: int
+    sum: float
+    max: float
+    buckets: Dict[str, int]
+
+class PoolCounters(BaseModel):
+    checked_out: int
+    idle: int
+    overflow: int
+    checkout_timeouts: int
+    wait_seconds: WaitHistogram
+
+# Connection pool state as reported by GET /metrics/db-pool (per worker process).
+# Top-level counters are the sync engine; async_pool is null until the async engine is first used.
+class PoolMetricsResponse(PoolCounters):
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    pool_recycle: int
+    pre_ping: bool
+    statement_timeout_ms: int
+    async_pool: Optional[PoolCounters] = None
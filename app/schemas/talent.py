@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 # Base Schema - Shared attributes
@@ -68,3 +68,18 @@ class TalentUpdate(BaseModel):
 
     class Config:
         from_attributes = True  # Ensures compatibility with ORM models
+
+# Per-row outcome of POST /talents/bulk, in request order
+class BulkTalentResult(BaseModel):
+    index: int
+    status: str  # created, updated, skipped or failed
+    email: Optional[str] = None
+    talent_id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkTalentResponse(BaseModel):
+    created: int
+    updated: int
+    skipped: int
+    failed: int
+    results: List[BulkTalentResult]
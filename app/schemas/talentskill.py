@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 # Base Schema - Shared attributes
@@ -23,3 +23,18 @@ class TalentSkillUpdate(BaseModel):
 # Response Schema
 class TalentSkillResponse(TalentSkillBase):
     model_config = ConfigDict(from_attributes=True)  # Pydantic v2 compatibility
+
+# Per-row outcome of POST /talentskills/bulk, in request order
+class BulkTalentSkillResult(BaseModel):
+    index: int
+    status: str  # created, updated, skipped or failed
+    talent_id: Optional[int] = None
+    skill_id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkTalentSkillResponse(BaseModel):
+    created: int
+    updated: int
+    skipped: int
+    failed: int
+    results: List[BulkTalentSkillResult]
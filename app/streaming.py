@@ -0,0 +1,56 @@
+import json
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from fastapi.responses import StreamingResponse
+
+from .concurrency import iterate_blocking
+
+
+def sse_event(event: str, data) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Stop proxies from buffering the stream and defeating the point of it
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def stream_llm_answer(
+    llm,
+    prompt: str,
+    head: Dict,
+    on_complete: Optional[Callable[[str], None]] = None
+) -> AsyncIterator[str]:
+    """
+    Emit `head` (request echo and retrieved sources) as a "sources" event straight
+    away, then a "token" event per chunk Gemini produces, then "done". Failures
+    after the response has started are reported as an "error" event. If the
+    answer completes, on_complete is called with the full text.
+    """
+    yield sse_event("sources", head)
+    parts = []
+    try:
+        async for chunk in iterate_blocking(llm.stream(prompt)):
+            text = chunk.content if isinstance(chunk.content, str) else "".join(
+                part if isinstance(part, str) else part.get("text", "") for part in chunk.content
+            )
+            if text:
+                parts.append(text)
+                yield sse_event("token", {"text": text})
+        if on_complete is not None:
+            on_complete("".join(parts))
+        yield sse_event("done", {})
+    except Exception as e:
+        yield sse_event("error", {"detail": str(e)})
+
+
+async def replay_answer(answer: str, head: Dict) -> AsyncIterator[str]:
+    """Serve an already generated answer in the same event format as stream_llm_answer."""
+    yield sse_event("sources", head)
+    yield sse_event("token", {"text": answer})
+    yield sse_event("done", {})
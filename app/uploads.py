@@ -0,0 +1,49 @@
+"""
+Limits and helpers for handling uploaded files without holding them in memory.
+
+Starlette already writes multipart file parts to a SpooledTemporaryFile;
+app.main sets the threshold at which those move from memory to disk from
+UPLOAD_SPOOL_THRESHOLD. Everything below reads uploads in chunks from that
+file rather than with `await file.read()`.
+"""
+import hashlib
+import os
+
+from fastapi import HTTPException, UploadFile
+
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(1024 * 1024)))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_MAX_PAGES = int(os.getenv("UPLOAD_MAX_PAGES", "30"))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def upload_size(file: UploadFile) -> int:
+    if file.size is not None:
+        return file.size
+    position = file.file.tell()
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(position)
+    return size
+
+
+def check_upload_size(file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> int:
+    """Reject an upload over max_bytes with a 413, otherwise return its size."""
+    size = upload_size(file)
+    if size > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{file.filename} is {size} bytes, the limit is {max_bytes} bytes"
+        )
+    return size
+
+
+def hash_upload(file: UploadFile) -> str:
+    """SHA-256 of an upload, read in chunks from its spooled file and rewound afterwards."""
+    digest = hashlib.sha256()
+    file.file.seek(0)
+    for block in iter(lambda: file.file.read(UPLOAD_CHUNK_SIZE), b""):
+        digest.update(block)
+    file.file.seek(0)
+    return digest.hexdigest()
+
@@ -0,0 +1,223 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# "atlas" uses the MongoDB Atlas $vectorSearch index, "local" the in-process NumPy index
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "atlas")
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", ".cache/vector_index")
+ATLAS_VECTOR_INDEX = os.getenv("ATLAS_VECTOR_INDEX", "vector_index")
+# Snapshot files older than this that the pointer no longer names are deleted by the next refresh
+STALE_SNAPSHOT_AGE = 600
+
+
+class AtlasVectorRetriever:
+    """Vector search through a MongoDB Atlas $vectorSearch index."""
+
+    def __init__(self, collection, index_name: str = ATLAS_VECTOR_INDEX, num_candidates: int = 10):
+        self.collection = collection
+        self.index_name = index_name
+        self.num_candidates = num_candidates
+
+    def search(self, query_embedding: List[float], limit: int = 5) -> List[Dict]:
+        results = self.collection.aggregate([
+            {
+                "$vectorSearch": {
+                    "index": self.index_name,
+                    "path": "embedding_array",
+                    "queryVector": query_embedding,
+                    "numCandidates": max(self.num_candidates, limit),
+                    "limit": limit
+                }
+            },
+            {
+                "$project": {
+                    "text": 1,
+                    "metadata": 1,
+                    "page_number": 1,
+                    "score": {"$meta": "vectorSearchScore"}
+                }
+            }
+        ])
+        return list(results)
+
+    def refresh(self) -> None:
+        """Atlas keeps its index in sync with the collection, nothing to do."""
+
+
+class LocalVectorIndex:
+    """
+    Exact cosine top-k over the collection's embedding_array vectors.
+
+    The vectors are L2-normalised into one contiguous float32 matrix saved as
+    an .npy file and memory-mapped on load, so a search is a single
+    matrix-vector product and needs no network access once the snapshot exists.
+
+    Each refresh writes its matrix and its JSON sidecar of documents under
+    fresh temporary names, then atomically replaces {collection}.current, a
+    pointer naming that pair. Concurrent refreshes and readers therefore
+    never combine one run's matrix with another run's documents. Snapshots
+    are built by ingestion and, when missing, by app.migrations; searching
+    before one exists returns no results instead of scanning the collection.
+    """
+
+    def __init__(self, collection, directory: str = VECTOR_INDEX_DIR):
+        self.collection = collection
+        self.directory = directory
+        self.pointer_path = os.path.join(directory, f"{collection.name}.current")
+        self._matrix: Optional["np.ndarray"] = None
+        self._documents: List[Dict] = []
+        self._loaded_mtime: Optional[int] = None
+        self._warned_missing = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._documents)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.pointer_path)
+
+    def refresh(self) -> int:
+        """Snapshot every embedded chunk of the collection to disk and reload it."""
+        import numpy as np
+
+        documents = []
+        vectors = []
+        cursor = self.collection.find(
+            {"embedding_array": {"$exists": True}},
+            {"text": 1, "metadata": 1, "page_number": 1, "embedding_array": 1}
+        )
+        for doc in cursor:
+            vectors.append(doc.pop("embedding_array"))
+            doc["_id"] = str(doc["_id"])
+            documents.append(doc)
+
+        if not vectors:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        else:
+            matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.maximum(norms, np.finfo(np.float32).tiny)
+
+        os.makedirs(self.directory, exist_ok=True)
+        pair = {
+            "matrix": os.path.basename(self._write_new(".npy", "wb", lambda f: np.save(f, matrix))),
+            "documents": os.path.basename(self._write_new(".json", "w", lambda f: json.dump(documents, f, default=str)))
+        }
+        previous = self._read_pointer()
+        # The pointer is the only file refreshes share, and it is swapped in one rename
+        os.replace(self._write_new(".current.tmp", "w", lambda f: json.dump(pair, f)), self.pointer_path)
+        self._remove_stale(keep=set(pair.values()) | set((previous or {}).values()))
+
+        with self._lock:
+            self._load()
+        return len(documents)
+
+    def search(self, query_embedding: List[float], limit: int = 5) -> List[Dict]:
+        import numpy as np
+
+        self._ensure_loaded()
+        matrix = self._matrix
+        if matrix is None or len(matrix) == 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape[0] != matrix.shape[1]:
+            raise ValueError(
+                f"Query embedding has {query.shape[0]} dimensions, index has {matrix.shape[1]}"
+            )
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+
+        scores = matrix @ (query / norm)
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [dict(self._documents[i], score=float(scores[i])) for i in top]
+
+    def _ensure_loaded(self) -> None:
+        try:
+            mtime = os.stat(self.pointer_path).st_mtime_ns
+        except FileNotFoundError:
+            if not self._warned_missing:
+                self._warned_missing = True
+                print(f"No local vector index for {self.collection.name} yet; vector search returns nothing "
+                      f"until it is ingested or `python -m app.migrations` builds it")
+            return
+        with self._lock:
+            # Pick up snapshots rebuilt by another worker
+            if self._loaded_mtime != mtime:
+                self._load()
+
+    def _load(self) -> None:
+        import numpy as np
+
+        for _ in range(2):
+            mtime = os.stat(self.pointer_path).st_mtime_ns
+            pair = self._read_pointer()
+            try:
+                matrix = np.load(os.path.join(self.directory, pair["matrix"]), mmap_mode="r")
+                with open(os.path.join(self.directory, pair["documents"])) as f:
+                    documents = json.load(f)
+            except FileNotFoundError:
+                # Cleaned up by a refresh that replaced the pointer meanwhile; read the new one
+                continue
+            self._matrix = matrix
+            self._documents = documents
+            self._loaded_mtime = mtime
+            return
+
+    def _read_pointer(self) -> Optional[Dict[str, str]]:
+        try:
+            with open(self.pointer_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_new(self, suffix: str, mode: str, write) -> str:
+        """Write a file under a name no other refresh can pick and return its path."""
+        with tempfile.NamedTemporaryFile(
+            mode, dir=self.directory, prefix=f"{self.collection.name}.", suffix=suffix, delete=False
+        ) as f:
+            write(f)
+        return f.name
+
+    def _remove_stale(self, keep: set) -> None:
+        # Keep the pair just replaced for readers still loading it, and leave recent files
+        # alone: they may belong to a refresh that has not swapped its pointer in yet
+        cutoff = time.time() - STALE_SNAPSHOT_AGE
+        prefix = f"{self.collection.name}."
+        for name in os.listdir(self.directory):
+            if not name.startswith(prefix) or name in keep or not name.endswith((".npy", ".json", ".tmp")):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+_retrievers: Dict[tuple, object] = {}
+_retrievers_lock = threading.Lock()
+
+
+def get_vector_retriever(collection):
+    """Return the configured vector retriever for a collection, one instance per process."""
+    key = (collection.database.name, collection.name)
+    with _retrievers_lock:
+        if key not in _retrievers:
+            if VECTOR_BACKEND == "atlas":
+                _retrievers[key] = AtlasVectorRetriever(collection)
+            elif VECTOR_BACKEND == "local":
+                _retrievers[key] = LocalVectorIndex(collection)
+            else:
+                raise ValueError(f"Unknown VECTOR_BACKEND '{VECTOR_BACKEND}', expected 'atlas' or 'local'")
+        return _retrievers[key]
@@ -0,0 +1,121 @@
+"""
+Rows per second through the bulk import endpoints.
+
+Drives POST /talents/bulk and POST /talentskills/bulk in-process with
+FastAPI's TestClient, so the timing covers JSON decoding, per-row validation,
+the foreign key checks and the INSERT ... ON CONFLICT batches, but no
+network. Four passes of --rows rows each, sent --request-rows per request:
+
+- talents: new talents, spread over the existing departments.
+- talents upsert: the same emails again with upsert=true and a changed
+  job title, so every row is an update.
+- talent skills: --skills-per-talent skills for each new talent, drawn from
+  the existing skills.
+- talent skills upsert: the same pairs again with upsert=true.
+
+Needs departments and skills to exist, so run it on a database filled by
+benchmarks.seed. The rows it creates are deleted afterwards unless --keep
+is passed:
+
+    python -m benchmarks.seed
+    python -m benchmarks.bulk_import --rows 20000
+"""
+import argparse
+import logging
+import time
+import uuid
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from app.database import engine
+
+
+def talent_rows(run: str, count: int, departments: List[int], job_title: str = "Engineer") -> List[Dict]:
+    return [
+        {
+            "first_name": "Bulk", "last_name": f"No {n}", "email": f"bulk-{run}-{n}@example.com",
+            "job_title": job_title, "department_id": departments[n % len(departments)], "age": 30,
+            "current_country": "Malaysia", "current_city": "Kuala Lumpur", "willing_to_relocate": n % 2 == 0,
+            "position_level": "Mid", "tech_skill": 3, "soft_skill": 4
+        }
+        for n in range(count)
+    ]
+
+
+def talent_skill_rows(talent_ids: List[int], skills: List[int], per_talent: int, proficiency: int = 3) -> List[Dict]:
+    return [
+        {
+            "talent_id": talent_id, "skill_id": skills[(position * per_talent + k) % len(skills)],
+            "proficiency_level": proficiency, "years_of_experience": k, "last_used_date": "2024-01-01T00:00:00"
+        }
+        for position, talent_id in enumerate(talent_ids)
+        for k in range(per_talent)
+    ]
+
+
+def post_all(client, path: str, rows: List[Dict], request_rows: int, upsert: bool) -> List[Dict]:
+    results = []
+    for start in range(0, len(rows), request_rows):
+        response = client.post(path, params={"upsert": upsert}, json=rows[start:start + request_rows])
+        response.raise_for_status()
+        body = response.json()
+        if body["failed"]:
+            failure = next(result for result in body["results"] if result["status"] == "failed")
+            raise SystemExit(f"{path}: {body['failed']} rows failed, e.g. {failure}")
+        results.extend(body["results"])
+    return results
+
+
+def measure(name: str, client, path: str, rows: List[Dict], request_rows: int, upsert: bool) -> List[Dict]:
+    started = time.perf_counter()
+    results = post_all(client, path, rows, request_rows, upsert)
+    elapsed = time.perf_counter() - started
+    statuses = sorted({result["status"] for result in results})
+    print(f"{name:22s} {len(rows):7d} rows in {elapsed:6.2f} s  {len(rows) / elapsed:8.0f} rows/s  ({', '.join(statuses)})")
+    return results
+
+
+def main(args) -> None:
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    # httpx logs every request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with engine.connect() as connection:
+        departments = list(connection.execute(text("SELECT department_id FROM department ORDER BY 1")).scalars())
+        skills = list(connection.execute(text("SELECT skill_id FROM skills ORDER BY 1")).scalars())
+    if not departments or len(skills) < args.skills_per_talent:
+        raise SystemExit("Seed the database first: python -m benchmarks.seed")
+
+    run = uuid.uuid4().hex[:8]
+    talents = talent_rows(run, args.rows, departments)
+    talent_ids = []
+    try:
+        with TestClient(app) as client:
+            created = measure("talents", client, "/talents/bulk", talents, args.request_rows, upsert=False)
+            talent_ids = [result["talent_id"] for result in created]
+            measure("talents upsert", client, "/talents/bulk",
+                    talent_rows(run, args.rows, departments, job_title="Senior Engineer"), args.request_rows, upsert=True)
+
+            # Same row count as the talent passes
+            skill_talents = talent_ids[:max(1, args.rows // args.skills_per_talent)]
+            measure("talent skills", client, "/talentskills/bulk",
+                    talent_skill_rows(skill_talents, skills, args.skills_per_talent), args.request_rows, upsert=False)
+            measure("talent skills upsert", client, "/talentskills/bulk",
+                    talent_skill_rows(skill_talents, skills, args.skills_per_talent, proficiency=4), args.request_rows, upsert=True)
+    finally:
+        if talent_ids and not args.keep:
+            with engine.begin() as connection:
+                connection.execute(text("DELETE FROM talentskills WHERE talent_id = ANY(:ids)"), {"ids": talent_ids})
+                connection.execute(text("DELETE FROM talents WHERE talent_id = ANY(:ids)"), {"ids": talent_ids})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--request-rows", type=int, default=5000, help="Rows per request, at most BULK_MAX_ROWS")
+    parser.add_argument("--skills-per-talent", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="Leave the created talents and talent skills in place")
+    main(parser.parse_args())
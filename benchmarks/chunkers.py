@@ -0,0 +1,130 @@
+"""
+Compare the structure-aware chunker with the old fixed-size splitter on the sample CVs.
+
+For each splitter this reports the chunk count, the characters sent for
+embedding (overlap makes the structured chunker send more), the number of
+chunks that begin or end in the middle of a word, the time to extract and
+chunk every file through the ingestion path (extract_chunk_documents for
+the structured chunker), and the retrieval hit rate: for random passages of --span-words words taken from the CVs, the
+share whose top --k chunks include one holding the whole passage. Passages
+split across chunk boundaries are misses.
+
+Ranking uses hashed bag-of-words vectors as an offline stand-in for the
+embedding model. It measures whether chunk boundaries keep a passage
+together, not embedding quality.
+
+    python -m benchmarks.chunkers
+    python -m benchmarks.chunkers --folder app/cv --queries 500 --k 3
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import random
+import re
+import time
+import zlib
+from typing import Callable, Dict, List, Set
+
+import numpy as np
+
+from app.chunking import CHUNK_SIZE, chunk_text
+from app.pdf_extraction import extract_chunk_documents, extract_pdf_pages, split_text_into_chunks
+
+DIMENSIONS = 4096
+_word = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def vectorize(texts: List[str]) -> np.ndarray:
+    matrix = np.zeros((len(texts), DIMENSIONS), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in _word.findall(text.lower()):
+            matrix[row, zlib.crc32(word.encode()) % DIMENSIONS] += 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-9)
+
+
+def fixed_documents(path: str) -> List[Dict]:
+    """The old pipeline: fixed CHUNK_SIZE slices of each page."""
+    return [
+        {"text": chunk, "metadata": page["metadata"]}
+        for page in extract_pdf_pages(path)
+        for chunk in split_text_into_chunks(page["text"], CHUNK_SIZE)
+    ]
+
+
+def structured_documents(path: str) -> List[Dict]:
+    # extract_pdf_chunks prints every chunk as JSON
+    with contextlib.redirect_stdout(io.StringIO()):
+        return extract_chunk_documents(path)
+
+
+def sample_passages(pages: List[str], count: int, words: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    page_words = [page.split() for page in pages if len(page.split()) >= words]
+    passages = []
+    for _ in range(count):
+        tokens = rng.choice(page_words)
+        start = rng.randrange(len(tokens) - words + 1)
+        passages.append(" ".join(tokens[start:start + words]))
+    return passages
+
+
+def broken_words(chunks: List[str], vocabulary: Set[str]) -> int:
+    """Chunk edges whose first or last token is not a word of the source text, i.e. a cut word."""
+    return sum(
+        (tokens[0] not in vocabulary) + (tokens[-1] not in vocabulary)
+        for tokens in (chunk.split() for chunk in chunks) if tokens
+    )
+
+
+def evaluate(name: str, extract: Callable[[str], List[Dict]], files: List[str], passages: List[str], vocabulary: Set[str], k: int) -> None:
+    started = time.perf_counter()
+    documents = [document for path in files for document in extract(path)]
+    elapsed = time.perf_counter() - started
+
+    chunks = [normalize(document["text"]) for document in documents]
+    scores = vectorize(passages) @ vectorize(chunks).T
+    top = np.argsort(-scores, axis=1)[:, :k]
+    hits = sum(
+        any(passage in chunks[index] for index in top[row])
+        for row, passage in enumerate(passages)
+    )
+    contained = sum(any(passage in chunk for chunk in chunks) for passage in passages)
+
+    print(
+        f"{name:11s} chunks={len(chunks):4d}  chars={sum(map(len, chunks)):7d}  "
+        f"mean={np.mean([len(c) for c in chunks]):5.0f}  broken words={broken_words(chunks, vocabulary):3d}  extract+chunk={elapsed * 1000:7.1f} ms  "
+        f"passage in some chunk={contained / len(passages):6.1%}  hit@{k}={hits / len(passages):6.1%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default="app/cv")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--span-words", type=int, default=12)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.folder, "*.pdf")))
+    if not files:
+        parser.error(f"no PDFs in {args.folder}")
+    pages = [normalize(page["text"]) for path in files for page in extract_pdf_pages(path)]
+    passages = sample_passages(pages, args.queries, args.span_words, args.seed)
+    vocabulary = {word for page in pages for word in page.split()}
+
+    # Structured chunks rejoin wrapped lines with single spaces; compare on whitespace-normalised text
+    print(f"{len(files)} files, {len(pages)} pages, {len(passages)} passages of {args.span_words} words, chunk size {CHUNK_SIZE}")
+    evaluate("fixed", fixed_documents, files, passages, vocabulary, args.k)
+    evaluate("structured", structured_documents, files, passages, vocabulary, args.k)
+
+
+if __name__ == "__main__":
+    main()
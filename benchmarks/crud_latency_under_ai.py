@@ -0,0 +1,124 @@
+"""
+CRUD latency while team-assembly requests are in flight.
+
+Serves the app in-process with Gemini and resume retrieval stubbed by calls
+that block for --llm-seconds and --retrieval-seconds, as the real clients
+do. GET /skills/ is timed with no AI traffic, then again while
+--ai-requests GET /rag/assemble-team/kai calls are running. --inline runs
+the stubbed calls directly on the event loop, as the handlers did before
+they went through app.concurrency.run_blocking, for comparison.
+
+Needs the Postgres configured by the DB_* variables (for /skills/) and httpx:
+
+    python -m benchmarks.crud_latency_under_ai
+    python -m benchmarks.crud_latency_under_ai --inline
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import threading
+import time
+import uuid
+
+import httpx
+import uvicorn
+
+
+class SlowLLM:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def predict(self, prompt: str) -> str:
+        time.sleep(self.seconds)
+        return "Recommended Team: ..."
+
+
+def stub_ai(llm_seconds: float, retrieval_seconds: float, inline: bool) -> None:
+    from app.clients import clients
+    from app.routers import rag
+
+    def find_similar_resumes(query, limit=5, query_embedding=None):
+        time.sleep(retrieval_seconds)
+        return []
+
+    clients.override("llm", SlowLLM(llm_seconds))
+    clients.override("mongo", {"capybara_db": {"resumes": None}})
+    rag.corpus_version = lambda collection: 0
+    rag.find_similar_resumes = find_similar_resumes
+    if inline:
+        async def run_inline(func, *args, **kwargs):
+            return func(*args, **kwargs)
+        rag.run_blocking = run_inline
+
+
+def serve(port: int) -> uvicorn.Server:
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def time_crud(client: httpx.AsyncClient, requests: int, concurrency: int):
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.get("/skills/", params={"limit": 20})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def summary(name: str, latencies) -> str:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    return (f"{name:28s} n={len(latencies):4d}  p50={statistics.median(latencies) * 1000:7.1f} ms"
+            f"  p95={p95 * 1000:7.1f} ms  max={latencies[-1] * 1000:7.1f} ms")
+
+
+async def main(args) -> None:
+    base_url = f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(max_connections=args.ai_requests + args.crud_concurrency + 10)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        await time_crud(client, 20, 2)  # warm up the pool
+        print(summary("GET /skills/ idle", await time_crud(client, args.crud_requests, args.crud_concurrency)))
+
+        started = time.perf_counter()
+        ai = [
+            asyncio.create_task(client.get("/rag/assemble-team/kai", params={"project_requirements": f"benchmark {uuid.uuid4()}"}))
+            for _ in range(args.ai_requests)
+        ]
+        await asyncio.sleep(0.2)  # let the AI requests reach the stubbed calls
+        print(summary(f"GET /skills/ with {args.ai_requests} AI calls", await time_crud(client, args.crud_requests, args.crud_concurrency)))
+        responses = await asyncio.gather(*ai)
+        assert all(response.status_code == 200 for response in responses), [r.text for r in responses if r.status_code != 200]
+        print(f"{args.ai_requests} AI requests finished in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ai-requests", type=int, default=8)
+    parser.add_argument("--llm-seconds", type=float, default=3.0)
+    parser.add_argument("--retrieval-seconds", type=float, default=0.2)
+    parser.add_argument("--crud-requests", type=int, default=200)
+    parser.add_argument("--crud-concurrency", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--inline", action="store_true", help="Block the event loop with the AI calls, as before run_blocking")
+    args = parser.parse_args()
+
+    stub_ai(args.llm_seconds, args.retrieval_seconds, args.inline)
+    serve(args.port)
+    # The app configures INFO logging; keep the per-request client lines out of the results
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(main(args))
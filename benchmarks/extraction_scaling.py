@@ -0,0 +1,93 @@
+"""
+PDF extraction throughput against the number of worker processes.
+
+Copies the sample CVs in --folder until there are --files of them, then
+parses them all through app.ingestion.extract_files once for each worker
+count in --workers, as PDF_EXTRACT_WORKERS would set it. The pool is
+started and warmed before the clock starts, so the timing covers parsing
+only. The spawn cost is printed on its own line.
+
+Speedup is relative to one worker; efficiency is speedup / workers. Expect it
+to flatten out past the number of physical cores (os.cpu_count() here).
+
+    python -m benchmarks.extraction_scaling
+    python -m benchmarks.extraction_scaling --files 400 --workers 1 2 4 8 16
+"""
+import argparse
+import asyncio
+import glob
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict
+
+from app.ingestion import ExtractionPool, extract_files
+from app.pdf_extraction import extract_pdf_pages
+
+
+def copy_corpus(source: str, target: str, files: int) -> Dict[str, str]:
+    samples = sorted(glob.glob(os.path.join(source, "*.pdf")))
+    if not samples:
+        raise SystemExit(f"No PDFs in {source}")
+    paths = {}
+    for index in range(files):
+        sample = samples[index % len(samples)]
+        filename = f"{index:05d}-{os.path.basename(sample)}"
+        paths[filename] = os.path.join(target, filename)
+        shutil.copyfile(sample, paths[filename])
+    return paths
+
+
+async def parse_all(paths: Dict[str, str], pool: ExtractionPool) -> int:
+    pages = 0
+    async for filename, documents, error in extract_files(paths, extract_pdf_pages, pool=pool):
+        if error is not None:
+            raise SystemExit(f"{filename}: {error}")
+        pages += len(documents)
+    return pages
+
+
+async def measure(paths: Dict[str, str], workers: int):
+    pool = ExtractionPool(workers)
+    try:
+        started = time.perf_counter()
+        # One file per worker starts every process and imports the parser in it
+        warm_up = dict(list(paths.items())[:workers])
+        await parse_all(warm_up, pool)
+        spawned = time.perf_counter() - started
+
+        started = time.perf_counter()
+        pages = await parse_all(paths, pool)
+        return spawned, time.perf_counter() - started, pages
+    finally:
+        pool.close()
+
+
+def main(args) -> None:
+    folder = tempfile.mkdtemp(prefix="extraction-benchmark-")
+    try:
+        paths = copy_corpus(args.folder, folder, args.files)
+        print(f"{args.files} files, os.cpu_count() = {os.cpu_count()}")
+        baseline = None
+        for workers in args.workers:
+            spawned, elapsed, pages = asyncio.run(measure(paths, workers))
+            if workers == 1:
+                baseline = elapsed
+            rate = args.files / elapsed
+            line = f"workers={workers:3d}  {elapsed:6.2f} s  {rate:7.1f} files/s  {pages / elapsed:7.1f} pages/s  spawn+warm-up {spawned:5.2f} s"
+            if baseline is not None:
+                speedup = baseline / elapsed
+                line += f"  speedup {speedup:4.2f}x  efficiency {speedup / workers:4.0%}"
+            print(line)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default="app/cv")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1, 2 * (os.cpu_count() or 1)}))
+    main(parser.parse_args())
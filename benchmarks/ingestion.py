@@ -0,0 +1,131 @@
+"""
+CV ingestion throughput: the old page-at-a-time loop against reindex_folder.
+
+Copies the sample CVs in --folder until there are --files of them, then
+indexes the copies twice into an in-memory collection:
+
+- old: the loop process_cv_folder ran before batching. It parses each file
+  in turn, then makes one embed_query call and one insert_one per page.
+- batched: app.ingestion.reindex_folder, as the kai loader calls it. It
+  parses in a process pool, then makes one embed_documents call and one
+  insert_many per --batch-size pages.
+
+The embedding model is replaced by a stub that sleeps --call-latency per
+request plus --text-latency per text, then returns random vectors. Gemini's
+latency is mostly the per-request part, which is what batching amortises.
+Mongo is mongomock, so the numbers leave out network round trips to Atlas,
+which would favour the batched path further. Needs mongomock.
+
+The last line projects both rates onto --project-files CVs.
+
+    python -m benchmarks.ingestion
+    python -m benchmarks.ingestion --files 500 --call-latency 0.3 --workers 8
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import io
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from app.ingestion import reindex_folder
+from app.pdf_extraction import extract_pdf_pages
+
+
+class SlowEmbeddings:
+    def __init__(self, call_latency: float, text_latency: float, dimensions: int = 768):
+        self.call_latency = call_latency
+        self.text_latency = text_latency
+        self.dimensions = dimensions
+        self.calls = 0
+
+    def _vectors(self, count: int):
+        self.calls += 1
+        time.sleep(self.call_latency + count * self.text_latency)
+        return np.random.default_rng().random((count, self.dimensions), dtype=np.float32).tolist()
+
+    def embed_query(self, text: str):
+        return self._vectors(1)[0]
+
+    def embed_documents(self, texts):
+        return self._vectors(len(texts))
+
+
+def copy_corpus(source: str, target: str, files: int) -> None:
+    samples = sorted(glob.glob(os.path.join(source, "*.pdf")))
+    if not samples:
+        raise SystemExit(f"No PDFs in {source}")
+    for index in range(files):
+        sample = samples[index % len(samples)]
+        shutil.copyfile(sample, os.path.join(target, f"{index:05d}-{os.path.basename(sample)}"))
+
+
+def old_ingest(folder: str, collection, embeddings) -> int:
+    pages = 0
+    for filename in sorted(os.listdir(folder)):
+        for doc in extract_pdf_pages(os.path.join(folder, filename)):
+            embedding = embeddings.embed_query(doc["text"])
+            collection.insert_one({"text": doc["text"], "metadata": doc["metadata"], "embedding_array": embedding})
+            pages += 1
+    return pages
+
+
+def batched_ingest(folder: str, collection, embeddings, batch_size: int, workers: int) -> int:
+    report = asyncio.run(reindex_folder(
+        folder, collection, embeddings, extract_pdf_pages,
+        batch_size=batch_size, workers=workers, pipeline_version="benchmark"
+    ))
+    assert not report["failed_files"] and not report["failed_documents"], report
+    return report["total_pages_processed"]
+
+
+def measure(name: str, ingest, files: int):
+    started = time.perf_counter()
+    # Both paths print a line per file
+    with contextlib.redirect_stdout(io.StringIO()):
+        pages, calls = ingest()
+    elapsed = time.perf_counter() - started
+    print(f"{name:8s} {files} files, {pages} pages in {elapsed:6.1f} s"
+          f"  {files / elapsed:6.1f} files/s  {pages / elapsed:6.1f} pages/s  {calls} embedding calls")
+    return files / elapsed
+
+
+def main(args) -> None:
+    import mongomock
+
+    folder = tempfile.mkdtemp(prefix="ingestion-benchmark-")
+    try:
+        copy_corpus(args.folder, folder, args.files)
+        database = mongomock.MongoClient()["benchmark"]
+
+        def run_old():
+            embeddings = SlowEmbeddings(args.call_latency, args.text_latency)
+            return old_ingest(folder, database["old"], embeddings), embeddings.calls
+
+        def run_batched():
+            embeddings = SlowEmbeddings(args.call_latency, args.text_latency)
+            return batched_ingest(folder, database["batched"], embeddings, args.batch_size, args.workers), embeddings.calls
+
+        old_rate = measure("old", run_old, args.files)
+        batched_rate = measure("batched", run_batched, args.files)
+        print(f"{args.project_files} CVs: old {args.project_files / old_rate / 60:.0f} min,"
+              f" batched {args.project_files / batched_rate / 60:.1f} min")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default="app/cv")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--call-latency", type=float, default=0.25, help="Seconds per embedding request")
+    parser.add_argument("--text-latency", type=float, default=0.002, help="Extra seconds per text in a request")
+    parser.add_argument("--project-files", type=int, default=3000)
+    main(parser.parse_args())
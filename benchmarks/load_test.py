@@ -0,0 +1,88 @@
+"""
+Closed-loop load test of the hot read endpoints.
+
+--concurrency clients each send one request at a time for --duration
+seconds. Each request is picked at random from GET /talents/, /talents/{id},
+/projects/ and /projects/{id}, with ids drawn up to --max-talent-id and
+--max-project-id. The script reports throughput, p50/p99 latency and
+failures, meaning non-200 responses and client errors. It then reports
+each pool's checkouts and longest checkout wait from GET /metrics/db-pool;
+those count from the worker's start, so restart it between runs.
+Needs aiohttp.
+
+Run a single uvicorn worker against a database filled by benchmarks.seed.
+Then run the client at each concurrency, once on the code before the async
+engine and once after:
+
+    uvicorn app.main:app --port 8001
+    python -m benchmarks.load_test --concurrency 50
+    python -m benchmarks.load_test --concurrency 500
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+import aiohttp
+
+
+def pick_path(args) -> str:
+    return random.choice((
+        "/talents/?limit=20",
+        f"/talents/{random.randint(1, args.max_talent_id)}",
+        "/projects/?limit=20",
+        f"/projects/{random.randint(1, args.max_project_id)}",
+    ))
+
+
+async def worker(session: aiohttp.ClientSession, args, stop: float, latencies, failures: Counter) -> None:
+    while time.perf_counter() < stop:
+        started = time.perf_counter()
+        try:
+            async with session.get(args.url + pick_path(args)) as response:
+                await response.read()
+                if response.status != 200:
+                    failures[response.status] += 1
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            failures[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - started)
+
+
+def pool_summary(name: str, pool) -> str:
+    if not pool:
+        return f"{name}: not in use"
+    waits = pool["wait_seconds"]
+    return f"{name}: {waits['count']} checkouts, longest wait {waits['max'] * 1000:.0f} ms"
+
+
+async def main(args) -> None:
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        latencies, failures = [], Counter()
+        stop = time.perf_counter() + args.duration
+        await asyncio.gather(*(worker(session, args, stop, latencies, failures) for _ in range(args.concurrency)))
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"concurrency={args.concurrency} requests={len(latencies)} rps={len(latencies) / args.duration:.0f}"
+              f"  p50={p50 * 1000:.0f} ms  p99={p99 * 1000:.0f} ms  failures={sum(failures.values())}"
+              f"{'  ' + str(dict(failures)) if failures else ''}")
+
+        async with session.get(args.url + "/metrics/db-pool") as response:
+            metrics = await response.json()
+        print(pool_summary("sync pool", metrics))
+        print(pool_summary("async pool", metrics.get("async_pool")))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8001")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-talent-id", type=int, default=30000)
+    parser.add_argument("--max-project-id", type=int, default=3000)
+    asyncio.run(main(parser.parse_args()))
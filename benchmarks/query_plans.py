@@ -0,0 +1,131 @@
+"""
+EXPLAIN ANALYZE the routers' hot queries, with and without the migration 1 indexes.
+
+Each query is run --runs times and the median execution time is reported,
+with the scans the plan used. --compare first runs every query inside a
+transaction that drops the indexes and the unique constraint migration 1
+adds, then rolls it back. That gives the before numbers without touching the
+schema, but it holds exclusive locks meanwhile, so use a scratch database
+seeded with benchmarks/seed.py:
+
+    python -m benchmarks.seed
+    python -m benchmarks.query_plans --compare
+"""
+import argparse
+import statistics
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.database import engine
+
+# What migration 1 (app.migrations._hot_path_indexes) adds
+MIGRATION_1_INDEXES = (
+    "ix_projectassignments_talent_id",
+    "ix_talentskills_skill_id_talent_id",
+    "ix_messages_conversation_id_message_id",
+    "ix_chat_user_id_started_at",
+    "ix_talents_department_id",
+    "ix_certification_talent_id",
+)
+MIGRATION_1_CONSTRAINT = ("projectassignments", "uq_projectassignments_project_id_talent_id")
+
+SKILLS = """(SELECT array_agg(s.skill_name) FROM talentskills ts JOIN skills s ON s.skill_id = ts.skill_id
+             WHERE ts.talent_id = t.talent_id)"""
+
+# The statements the routers issue, with parameters filled in from the data
+QUERIES = {
+    "chat messages page (GET /chat/../messages)":
+        "SELECT * FROM messages WHERE conversation_id = :conversation_id ORDER BY message_id DESC LIMIT 100",
+    "user's chats (GET /chat/{user_id})":
+        "SELECT * FROM chat WHERE user_id = :user_id ORDER BY started_at DESC",
+    "project team with skills (profile card)":
+        f"""SELECT t.*, d.department_name, pa.role, {SKILLS} FROM talents t
+            JOIN projectassignments pa ON pa.talent_id = t.talent_id
+            JOIN department d ON d.department_id = t.department_id
+            WHERE pa.project_id = :project_id""",
+    "available talents page (profile card)":
+        f"""SELECT t.*, d.department_name, {SKILLS} FROM talents t
+            JOIN department d ON d.department_id = t.department_id
+            WHERE t.talent_id NOT IN (SELECT talent_id FROM projectassignments WHERE project_id = :project_id)
+            ORDER BY t.talent_id LIMIT 100""",
+    "assignment lookup (project_id, talent_id)":
+        "SELECT 1 FROM projectassignments WHERE project_id = :project_id AND talent_id = :talent_id",
+    "talent's assignments (talent_id)":
+        "SELECT * FROM projectassignments WHERE talent_id = :talent_id",
+    "talents with a skill (skill_id)":
+        "SELECT talent_id FROM talentskills WHERE skill_id = :skill_id",
+    "talent's certifications (talent_id)":
+        "SELECT * FROM certification WHERE talent_id = :talent_id",
+    "department's talents (department_id)":
+        "SELECT talent_id FROM talents WHERE department_id = :department_id LIMIT 100",
+}
+
+
+def sample_parameters(connection: Connection) -> Dict[str, int]:
+    """Busy-but-typical ids: the largest conversation, chat owner, team and skill."""
+    row = connection.execute(text("""
+        SELECT
+            (SELECT conversation_id FROM messages GROUP BY conversation_id ORDER BY count(*) DESC LIMIT 1),
+            (SELECT user_id FROM chat GROUP BY user_id ORDER BY count(*) DESC LIMIT 1),
+            (SELECT project_id FROM projectassignments GROUP BY project_id ORDER BY count(*) DESC LIMIT 1),
+            (SELECT talent_id FROM certification GROUP BY talent_id ORDER BY count(*) DESC LIMIT 1),
+            (SELECT skill_id FROM talentskills GROUP BY skill_id ORDER BY count(*) DESC LIMIT 1),
+            (SELECT department_id FROM talents GROUP BY department_id ORDER BY count(*) DESC LIMIT 1)
+    """)).one()
+    return dict(zip(("conversation_id", "user_id", "project_id", "talent_id", "skill_id", "department_id"), row))
+
+
+def scans(node: Dict) -> List[str]:
+    found = []
+    if "Scan" in node["Node Type"]:
+        found.append(f"{node['Node Type']} ({node.get('Index Name') or node.get('Relation Name')})")
+    for child in node.get("Plans", []):
+        found.extend(scans(child))
+    return list(dict.fromkeys(found))
+
+
+def measure(connection: Connection, parameters: Dict[str, int], runs: int) -> Dict[str, Tuple[float, List[str]]]:
+    results = {}
+    for name, sql in QUERIES.items():
+        times = []
+        for _ in range(runs):
+            plan = connection.execute(text("EXPLAIN (ANALYZE, FORMAT JSON) " + sql), parameters).scalar()[0]
+            times.append(plan["Execution Time"])
+        results[name] = (statistics.median(times), scans(plan["Plan"]))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--compare", action="store_true", help="Also measure without the migration 1 indexes")
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        parameters = sample_parameters(connection)
+        print("parameters:", parameters)
+
+        before = None
+        if args.compare:
+            for index in MIGRATION_1_INDEXES:
+                connection.execute(text(f"DROP INDEX IF EXISTS {index}"))
+            table, constraint = MIGRATION_1_CONSTRAINT
+            connection.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}"))
+            before = measure(connection, parameters, args.runs)
+            connection.rollback()
+
+        after = measure(connection, parameters, args.runs)
+        connection.rollback()
+
+    for name, (milliseconds, used) in after.items():
+        if before is not None:
+            print(f"{name:45s} {before[name][0]:9.3f} ms -> {milliseconds:7.3f} ms   {', '.join(used)}")
+            print(f"{'':45s} before: {', '.join(before[name][1])}")
+        else:
+            print(f"{name:45s} {milliseconds:9.3f} ms   {', '.join(used)}")
+
+
+if __name__ == "__main__":
+    main()
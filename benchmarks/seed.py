@@ -0,0 +1,103 @@
+"""
+Fill the database with synthetic data for the query-plan and load benchmarks.
+
+Runs the Postgres migrations first, then adds rows next to whatever is
+already there, referencing ids that exist. At the default scale that is 5 departments, 200 skills, 2,000 users,
+30,000 talents with 5 skills each, 3,000 projects, about 60,000
+assignments, 40,000 chats, 800,000 messages and 40,000 certifications.
+Point the DB_* variables at a scratch database:
+
+    python -m benchmarks.seed --scale 1
+"""
+import argparse
+import time
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.migrations import migrate_postgres
+
+# Each statement picks foreign keys from arrays of existing ids, so it works on a non-empty database
+STATEMENTS = [
+    ("departments", """
+        INSERT INTO department (department_name)
+        SELECT 'Department ' || g FROM generate_series(1, 5) g
+    """),
+    ("skills", """
+        INSERT INTO skills (skill_name, skill_category)
+        SELECT 'seed-skill-' || :run || '-' || g, 'Technical' FROM generate_series(1, 200) g
+    """),
+    ("users", """
+        WITH d AS (SELECT array_agg(department_id) ids FROM department)
+        INSERT INTO users (name, email, role, department_id)
+        SELECT 'User ' || g, 'seed-user-' || :run || '-' || g || '@example.com', 'hr', d.ids[1 + g % cardinality(d.ids)]
+        FROM d, generate_series(1, 2000 * :scale) g
+    """),
+    ("talents", """
+        WITH d AS (SELECT array_agg(department_id) ids FROM department)
+        INSERT INTO talents (first_name, last_name, email, job_title, department_id, basic_salary, age,
+                             current_country, current_city, willing_to_relocate, position_level, tech_skill, soft_skill)
+        SELECT 'Talent', 'No ' || g, 'seed-talent-' || :run || '-' || g || '@example.com', 'Engineer',
+               d.ids[1 + g % cardinality(d.ids)], 3000 + g % 5000, 22 + g % 40, 'MY', 'Kuala Lumpur', g % 2 = 0, 'Mid', 3, 3
+        FROM d, generate_series(1, 30000 * :scale) g
+    """),
+    ("talent skills", """
+        WITH s AS (SELECT array_agg(skill_id ORDER BY skill_id) ids FROM skills)
+        INSERT INTO talentskills (talent_id, skill_id, proficiency_level, years_of_experience, last_used_date)
+        SELECT t.talent_id, s.ids[1 + (t.talent_id * 7 + k * 13) % cardinality(s.ids)], 1 + k, k, now()
+        FROM s, talents t, generate_series(0, 4) k
+        WHERE t.email LIKE 'seed-talent-' || :run || '-%'
+        ON CONFLICT DO NOTHING
+    """),
+    ("projects", """
+        INSERT INTO projects (name, status, tech_skill, quality, collaboration)
+        SELECT 'Project ' || g, 'active', 3, 3, 3 FROM generate_series(1, 3000 * :scale) g
+    """),
+    ("project assignments", """
+        WITH p AS (SELECT array_agg(project_id) ids FROM projects),
+             t AS (SELECT array_agg(talent_id) ids FROM talents)
+        INSERT INTO projectassignments (project_id, talent_id, role, assignment_start_date)
+        SELECT p.ids[1 + g % cardinality(p.ids)], t.ids[1 + (g * 37 + g / 30000) % cardinality(t.ids)], 'Developer', now()
+        FROM p, t, generate_series(1, 60000 * :scale) g
+        ON CONFLICT DO NOTHING
+    """),
+    ("chats", """
+        WITH u AS (SELECT array_agg(user_id) ids FROM users)
+        INSERT INTO chat (user_id, title, started_at)
+        SELECT u.ids[1 + g % cardinality(u.ids)], 'Chat ' || g, now() - g * interval '1 minute'
+        FROM u, generate_series(1, 40000 * :scale) g
+    """),
+    ("messages", """
+        WITH c AS (SELECT array_agg(conversation_id) ids FROM chat)
+        INSERT INTO messages (conversation_id, sender, message_text, created_at)
+        SELECT c.ids[1 + g % cardinality(c.ids)], CASE WHEN g % 2 = 0 THEN 'user' ELSE 'assistant' END,
+               'Message ' || g, now() - g * interval '1 second'
+        FROM c, generate_series(1, 800000 * :scale) g
+    """),
+    ("certifications", """
+        WITH t AS (SELECT array_agg(talent_id) ids FROM talents)
+        INSERT INTO certification (talent_id, certification_name, issuing_organization, start_date)
+        SELECT t.ids[1 + g % cardinality(t.ids)], 'Certification ' || g, 'Issuer', now()
+        FROM t, generate_series(1, 40000 * :scale) g
+    """),
+]
+
+
+def seed(scale: int) -> None:
+    run = str(int(time.time()))
+    with engine.begin() as connection:
+        for name, statement in STATEMENTS:
+            started = time.perf_counter()
+            inserted = connection.execute(text(statement), {"scale": scale, "run": run}).rowcount
+            print(f"{name:20s} {inserted:9d} rows  {time.perf_counter() - started:6.1f} s")
+    # Fresh planner statistics, as autovacuum would eventually produce
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=1, help="Multiplies every row count except departments and skills")
+    args = parser.parse_args()
+    migrate_postgres()
+    seed(args.scale)
@@ -0,0 +1,125 @@
+"""
+API cold-start profile.
+
+Every measurement runs in a fresh interpreter, so nothing is cached in the
+process (the OS file cache stays warm after the first run):
+
+- import: wall time of `import app.main`, --runs times.
+- first response: time from launching `uvicorn app.main:app` to the first
+  200 from GET /, --runs times. This adds app construction, router setup
+  and the lifespan.
+- the --top top-level packages by time spent importing their own modules,
+  from `python -X importtime -c "import app.main"`.
+- which of the heavy optional libraries (langchain, Gemini SDK, pymongo,
+  numpy, the PDF libraries, ...) importing app.main loaded. They should
+  all load on first use instead.
+
+app.database builds its engine URL at import, so set the DB_* variables;
+nothing connects unless RUN_MIGRATIONS_ON_STARTUP=true. To compare with an
+older revision, check it out next to this one and point --app-dir at it:
+
+    python -m benchmarks.startup
+    git worktree add /tmp/before <revision>
+    python -m benchmarks.startup --app-dir /tmp/before
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+HEAVY_MODULES = (
+    "langchain_core", "langchain_google_genai", "google.generativeai", "google.ai",
+    "pymongo", "numpy", "pypdf", "PyPDF2", "requests", "asyncpg"
+)
+
+IMPORT_TIMER = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+
+def run_python(app_dir: str, *args: str) -> subprocess.CompletedProcess:
+    result = subprocess.run([sys.executable, *args], cwd=app_dir, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"`import app.main` failed in {app_dir}:\n{result.stderr[-2000:]}")
+    return result
+
+
+def import_seconds(app_dir: str) -> float:
+    return float(run_python(app_dir, "-c", IMPORT_TIMER).stdout.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_response_seconds(app_dir: str, timeout: float = 60.0) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited before answering; run it by hand to see why")
+                time.sleep(0.01)
+        raise RuntimeError(f"No response within {timeout:g}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def import_profile(app_dir: str):
+    """({top-level package: microseconds spent in its own modules}, set of loaded heavy modules)"""
+    report = run_python(app_dir, "-X", "importtime", "-c", "import app.main").stderr
+    totals = defaultdict(int)
+    loaded = set()
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        # Self time, so a package is not charged for what its imports import
+        totals[name.split(".")[0]] += int(own)
+        if name in HEAVY_MODULES:
+            loaded.add(name)
+    return totals, loaded
+
+
+def summary(name: str, samples) -> str:
+    return (f"{name:15s} median {statistics.median(samples):.3f} s"
+            f"  min {min(samples):.3f} s  max {max(samples):.3f} s  ({len(samples)} runs)")
+
+
+def main(args) -> None:
+    app_dir = os.path.abspath(args.app_dir)
+    # One untimed import first, so every timed run sees the same warm file cache and bytecode
+    import_seconds(app_dir)
+    print(f"app: {app_dir}")
+    print(summary("import app.main", [import_seconds(app_dir) for _ in range(args.runs)]))
+    print(summary("first response", [first_response_seconds(app_dir) for _ in range(args.runs)]))
+
+    totals, loaded = import_profile(app_dir)
+    print("import time by package (self time, from -X importtime):")
+    for name, microseconds in sorted(totals.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:30s} {microseconds / 1e6:6.3f} s")
+    print(f"heavy modules loaded at import: {', '.join(sorted(loaded)) or 'none'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-dir", default=".", help="Checkout whose app package is measured")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=12)
+    main(parser.parse_args())
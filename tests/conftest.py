@@ -0,0 +1,69 @@
+"""
+Shared fixtures.
+
+Tests that need Postgres use the database the DB_* variables point at (see
+.env.example) and are skipped when it cannot be reached. They run the
+migrations, create the rows they need and delete them afterwards, but
+point them at a scratch database all the same.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+
+
+@pytest.fixture(scope="session")
+def pg():
+    from app.database import engine
+    from app.migrations import migrate_postgres
+
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except OperationalError as e:
+        pytest.skip(f"Postgres is not reachable: {e.orig}")
+    migrate_postgres()
+    return engine
+
+
+@pytest.fixture(scope="session")
+def client(pg):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    # One client for the session, so the async engine stays on one event loop
+    with TestClient(app) as client:
+        yield client
+
+
+class QueryCounter:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_queries(pg):
+    """`with count_queries() as counter:` records every statement either engine sends"""
+    from app.database import get_async_engine
+
+    @contextmanager
+    def counting():
+        counter = QueryCounter()
+        engines = (pg, get_async_engine().sync_engine)
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", counter)
+        try:
+            yield counter
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", counter)
+
+    return counting
@@ -0,0 +1,73 @@
+import uuid
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Talent
+
+
+@pytest.fixture
+def emails(pg):
+    tag = uuid.uuid4().hex[:8]
+    emails = [f"bulk-{tag}-{n}@example.com" for n in range(3)]
+    yield emails
+    with Session(pg) as db:
+        db.query(Talent).filter(Talent.email.in_(emails)).delete(synchronize_session=False)
+        db.commit()
+
+
+def talent(email, **fields):
+    return {
+        "first_name": "Bulk", "last_name": "Test", "email": email, "age": 30, "current_country": "MY",
+        "current_city": "KL", "willing_to_relocate": True, "position_level": "Mid", "tech_skill": 3, "soft_skill": 3,
+        **fields
+    }
+
+
+def stored(pg, email):
+    with Session(pg) as db:
+        return db.query(Talent).filter(Talent.email == email).one()
+
+
+def test_bulk_create_then_skip_existing(client, emails):
+    body = client.post("/talents/bulk", json=[talent(emails[0]), talent(emails[1]), talent(emails[1])]).json()
+    assert [r["status"] for r in body["results"]] == ["created", "created", "failed"]
+    assert "already in row 1" in body["results"][2]["error"]
+
+    body = client.post("/talents/bulk", json=[talent(emails[0], job_title="Changed")]).json()
+    assert body["skipped"] == 1 and body["results"][0]["talent_id"] is not None
+
+
+def test_upsert_only_overwrites_fields_sent(client, pg, emails):
+    client.post("/talents/bulk", json=[
+        talent(emails[0], phone="+60111", job_title="Engineer", basic_salary=5000.0),
+        talent(emails[1], phone="+60222", job_title="Analyst"),
+    ])
+
+    # Rows with different field sets in one request; an explicit null clears a field
+    body = client.post("/talents/bulk", params={"upsert": True}, json=[
+        talent(emails[0], job_title="Lead Engineer"),
+        talent(emails[1], phone=None),
+        talent(emails[2], phone="+60333"),
+    ]).json()
+    assert [r["status"] for r in body["results"]] == ["updated", "updated", "created"]
+
+    first, second = stored(pg, emails[0]), stored(pg, emails[1])
+    assert (first.job_title, first.phone, first.basic_salary) == ("Lead Engineer", "+60111", 5000.0)
+    assert (second.job_title, second.phone) == ("Analyst", None)
+    assert stored(pg, emails[2]).phone == "+60333"
+
+
+def test_row_the_database_rejects_fails_alone(client, pg, emails):
+    # Passes validation but overflows current_country VARCHAR(50), so the batch falls back to row by row
+    body = client.post("/talents/bulk", json=[
+        talent(emails[0]),
+        talent(emails[1], current_country="X" * 51),
+        talent(emails[2]),
+    ]).json()
+
+    assert [r["status"] for r in body["results"]] == ["created", "failed", "created"]
+    assert "too long" in body["results"][1]["error"]
+    assert (body["created"], body["failed"]) == (2, 1)
+    with Session(pg) as db:
+        assert {t.email for t in db.query(Talent).filter(Talent.email.in_(emails))} == {emails[0], emails[2]}
@@ -0,0 +1,51 @@
+import glob
+import os
+
+import pytest
+
+from app.chunking import chunk_text
+
+CV_FOLDER = os.path.join(os.path.dirname(__file__), "..", "app", "cv")
+
+RESUME = """PROFESSIONAL SUMMARY
+Data engineer with six years of experience building pipelines. Led a team of four.
+
+EXPERIENCE
+• Built a streaming ingestion service handling 2 million events per day for the payments team.
+• Cut warehouse costs by 30% by partitioning the largest tables and archiving cold data.
+• Migrated nightly batch jobs from cron to Airflow with alerting and retries.
+
+SKILLS
+Python, SQL, Spark, Airflow
+"""
+
+
+def test_chunks_respect_size_and_never_cut_words():
+    chunks = chunk_text(RESUME, chunk_size=120, overlap=40)
+    words = set(RESUME.split())
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert all(word in words for chunk in chunks for word in chunk.split())
+
+
+def test_continuation_chunks_repeat_heading_and_overlap():
+    chunks = chunk_text(RESUME, chunk_size=220, overlap=100)
+    experience = [chunk for chunk in chunks if chunk.startswith("EXPERIENCE")]
+    assert len(experience) > 1
+    # Each continuation carries the last bullet of the chunk before it
+    for previous, following in zip(experience, experience[1:]):
+        assert previous.splitlines()[-1] in following
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("Python, SQL", chunk_size=500) == ["Python, SQL"]
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(CV_FOLDER, "*.pdf"))), ids=os.path.basename)
+def test_sample_cvs_chunk_through_ingestion_path(path):
+    pytest.importorskip("PyPDF2")
+    from app.pdf_extraction import extract_chunk_documents
+
+    documents = extract_chunk_documents(path)
+    assert documents
+    assert [document["chunk_number"] for document in documents] == list(range(1, len(documents) + 1))
+    assert all(document["text"].strip() for document in documents)
@@ -0,0 +1,55 @@
+import asyncio
+import multiprocessing
+import os
+import time
+
+from app.ingestion import ExtractionPool, extract_files
+
+
+def parse(path: str):
+    """Stand-in for a PDF parser, run in the spawned workers. "hang:<file>" records its PID there and never returns."""
+    if path.startswith("hang:"):
+        with open(path[len("hang:"):], "w") as f:
+            f.write(str(os.getpid()))
+        time.sleep(300)
+    if path == "fail":
+        raise ValueError("not a PDF")
+    return [{"text": path, "pid": os.getpid()}]
+
+
+def collect(paths, **kwargs):
+    async def run():
+        return {filename: (documents, error) async for filename, documents, error in extract_files(paths, parse, **kwargs)}
+    return asyncio.run(run())
+
+
+def test_results_and_errors_per_file():
+    results = collect({"a.pdf": "a", "b.pdf": "b", "bad.pdf": "fail"}, workers=2)
+
+    assert results["a.pdf"][0][0]["text"] == "a" and results["b.pdf"][0][0]["text"] == "b"
+    assert isinstance(results["bad.pdf"][1], ValueError)
+
+
+def test_hung_worker_is_killed_and_the_rest_finish(tmp_path):
+    pid_file = tmp_path / "hung.pid"
+    paths = {"hung.pdf": f"hang:{pid_file}", **{f"{name}.pdf": name for name in "abcd"}}
+
+    results = collect(paths, workers=2, timeout=2)
+
+    assert isinstance(results["hung.pdf"][1], TimeoutError)
+    assert all(results[f"{name}.pdf"][0][0]["text"] == name for name in "abcd")
+    hung = int(pid_file.read_text())
+    deadline = time.monotonic() + 10
+    while hung in {process.pid for process in multiprocessing.active_children()} and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert hung not in {process.pid for process in multiprocessing.active_children()}
+
+
+def test_shared_pool_keeps_its_workers_between_calls():
+    pool = ExtractionPool(1)
+    try:
+        first = collect({"a.pdf": "a"}, pool=pool)["a.pdf"][0][0]["pid"]
+        second = collect({"b.pdf": "b"}, pool=pool)["b.pdf"][0][0]["pid"]
+    finally:
+        pool.close()
+    assert first == second
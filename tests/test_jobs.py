@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import jobs
+from app.jobs import JobAlreadyRunning, JobExpired, JobStore, run_job, submit_job
+
+mongomock = pytest.importorskip("mongomock")
+
+
+@pytest.fixture
+def store():
+    store = JobStore(mongomock.MongoClient()["capybara_db"]["ingestion_jobs"])
+    store.create_indexes()
+    return store
+
+
+def test_one_active_job_per_kind(store):
+    job = store.create("pdf", {})
+    with pytest.raises(JobAlreadyRunning) as e:
+        store.create("pdf", {})
+    assert e.value.job["job_id"] == job["job_id"]
+    # Other kinds have their own slot
+    store.create("pdf-omar", {})
+
+
+def test_concurrent_creates_claim_the_slot_once(store):
+    created, rejected = [], []
+    start = threading.Barrier(8)
+
+    def claim():
+        start.wait()
+        try:
+            created.append(store.create("pdf", {}))
+        except JobAlreadyRunning:
+            rejected.append(True)
+
+    threads = [threading.Thread(target=claim) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1 and len(rejected) == 7
+
+
+def test_stale_job_releases_the_slot(store):
+    stale = store.create("pdf", {})
+    store.collection.update_one(
+        {"_id": stale["job_id"]},
+        {"$set": {"heartbeat_at": datetime.utcnow() - timedelta(seconds=jobs.INGESTION_JOB_STALE_AFTER + 1)}}
+    )
+    store.create("pdf", {})
+    assert store.get(stale["job_id"])["status"] == "failed"
+
+
+def test_run_job_waits_and_frees_the_slot(store):
+    async def run(progress):
+        progress({"files_done": 1})
+        return {"ok": True}
+
+    assert asyncio.run(run_job(store, "pdf", run, {})) == {"ok": True}
+    job = store.list("pdf")[0]
+    assert job["status"] == "completed" and job["files_done"] == 1
+    assert store.active("pdf") is None
+
+
+def test_run_job_failure_is_recorded_and_raised(store):
+    async def run(progress):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_job(store, "pdf", run, {}))
+    assert store.list("pdf")[0]["status"] == "failed"
+    assert store.active("pdf") is None
+
+
+def test_sync_run_is_rejected_while_a_job_is_active(store):
+    release = threading.Event()
+
+    async def slow(progress):
+        await asyncio.to_thread(release.wait, 5)
+        return {}
+
+    submit_job(store, "pdf", slow, {})
+    try:
+        with pytest.raises(JobAlreadyRunning):
+            asyncio.run(run_job(store, "pdf", slow, {}))
+    finally:
+        release.set()
+
+
+def test_heartbeat_keeps_a_silent_job_alive(store, monkeypatch):
+    monkeypatch.setattr(jobs, "INGESTION_JOB_HEARTBEAT", 0.05)
+    monkeypatch.setattr(jobs, "INGESTION_JOB_STALE_AFTER", 0.3)
+    release = threading.Event()
+
+    async def silent(progress):
+        # No progress calls, like a job parsing one slow file
+        await asyncio.to_thread(release.wait, 5)
+        return {}
+
+    job, future = jobs._submit(store, "pdf", silent, {})
+    try:
+        time.sleep(1.0)
+        with pytest.raises(JobAlreadyRunning):
+            store.create("pdf", {})
+    finally:
+        release.set()
+    future.result(5)
+    assert store.get(job["job_id"])["status"] == "completed"
+
+
+def test_job_expired_in_flight_cannot_overwrite_its_record(store, monkeypatch):
+    monkeypatch.setattr(jobs, "INGESTION_JOB_HEARTBEAT", 0.05)
+    release = threading.Event()
+    finished = []
+
+    async def run(progress):
+        progress({"files_done": 0})
+        await asyncio.to_thread(release.wait, 5)
+        # The next progress point notices the expiry and stops the run
+        progress({"files_done": 1})
+        finished.append(True)
+        return {"ok": True}
+
+    job, future = jobs._submit(store, "pdf", run, {})
+    while store.get(job["job_id"])["status"] != "running":
+        time.sleep(0.01)
+    # Simulate the heartbeat going quiet long enough for another worker to take the slot
+    store.collection.update_one(
+        {"_id": job["job_id"]},
+        {"$set": {"heartbeat_at": datetime.utcnow() - timedelta(seconds=jobs.INGESTION_JOB_STALE_AFTER + 1)}}
+    )
+    replacement = store.create("pdf", {})
+    time.sleep(0.2)
+    release.set()
+
+    with pytest.raises(JobExpired):
+        future.result(5)
+    assert finished == []
+    expired = store.get(job["job_id"])
+    assert expired["status"] == "failed" and expired["active"] is False and expired["result"] is None
+    assert store.active("pdf")["job_id"] == replacement["job_id"]
@@ -0,0 +1,70 @@
+import uuid
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Department, Project, ProjectAssignment, Skill, Talent, TalentSkill
+
+SKILLS_PER_TALENT = 3
+
+
+@pytest.fixture
+def teams(pg):
+    """Two projects sharing one department: a team of 1 and a team of 40, each member with 3 skills"""
+    tag = uuid.uuid4().hex[:8]
+    with Session(pg) as db:
+        department = Department(department_name=f"test-{tag}")
+        skills = [Skill(skill_name=f"test-{tag}-{n}") for n in range(SKILLS_PER_TALENT)]
+        projects = {size: Project(name=f"test-{tag}-{size}", tech_skill=3, quality=3, collaboration=3) for size in (1, 40)}
+        db.add_all([department, *skills, *projects.values()])
+        db.flush()
+
+        talents = []
+        for size, project in projects.items():
+            for n in range(size):
+                talent = Talent(
+                    first_name="Test", last_name=f"{size}-{n}", email=f"test-{tag}-{size}-{n}@example.com",
+                    job_title="Engineer", basic_salary=1000.0, department_id=department.department_id,
+                    age=30, current_country="MY", current_city="KL", willing_to_relocate=False, position_level="Mid"
+                )
+                talents.append((project, talent))
+        db.add_all(talent for _, talent in talents)
+        db.flush()
+        for project, talent in talents:
+            db.add(ProjectAssignment(project_id=project.project_id, talent_id=talent.talent_id, role="dev"))
+            db.add_all(TalentSkill(talent_id=talent.talent_id, skill_id=skill.skill_id, proficiency_level=3) for skill in skills)
+        db.commit()
+        project_ids = {size: project.project_id for size, project in projects.items()}
+        talent_ids = [talent.talent_id for _, talent in talents]
+
+    yield project_ids
+
+    with Session(pg) as db:
+        db.query(ProjectAssignment).filter(ProjectAssignment.project_id.in_(project_ids.values())).delete()
+        db.query(TalentSkill).filter(TalentSkill.talent_id.in_(talent_ids)).delete()
+        db.query(Talent).filter(Talent.talent_id.in_(talent_ids)).delete()
+        db.query(Project).filter(Project.project_id.in_(project_ids.values())).delete()
+        db.query(Skill).filter(Skill.skill_name.like(f"test-{tag}-%")).delete(synchronize_session=False)
+        db.query(Department).filter(Department.department_name == f"test-{tag}").delete()
+        db.commit()
+
+
+def test_team_roster_query_count_does_not_grow_with_team_size(client, teams, count_queries):
+    # Warm up so connecting and dialect setup are not counted
+    client.get(f"/profile-card/project/{teams[1]}/team")
+
+    counts = {}
+    for size, project_id in teams.items():
+        with count_queries() as counter:
+            response = client.get(f"/profile-card/project/{project_id}/team")
+        assert response.status_code == 200
+        members = response.json()
+        assert len(members) == size
+        assert all(len(member["skills"]) == SKILLS_PER_TALENT for member in members)
+        counts[size] = counter.count
+
+    assert counts[1] == counts[40] == 2  # project exists check + roster
+
+
+def test_team_roster_unknown_project(client):
+    assert client.get("/profile-card/project/0/team").status_code == 404
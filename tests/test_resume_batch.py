@@ -0,0 +1,132 @@
+"""
+POST /gemini/summarize_resumes with the Gemini extraction chain stubbed.
+
+Each file gets its own NDJSON line, and failures carry the status and detail
+POST /gemini/summarize_resume would have answered with for the same file.
+"""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from pdf_files import write_pdf
+
+pytest.importorskip("httpx")
+pytest.importorskip("pypdf")
+
+
+class StubChain:
+    """Answers with the first word of the resume, after `delay` seconds, and records the peak concurrency."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, inputs):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            first_word = inputs["text"].split()[0]
+            if first_word == "Unparseable":
+                raise ValueError("Invalid response format from Gemini")
+            return {"firstName": first_word}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def gemini(monkeypatch, tmp_path):
+    from app.clients import clients
+    from app.ingestion import ExtractionPool
+    from app.routers import gemini
+
+    pool = ExtractionPool(2)
+    monkeypatch.setattr(gemini, "RESUME_CACHE_PATH", str(tmp_path / "summaries.sqlite3"))
+    monkeypatch.setattr(gemini, "_gemini_slots", asyncio.Semaphore(2))
+    clients.override("resume_extraction_pool", pool)
+    try:
+        yield gemini
+    finally:
+        clients.override("resume_chain", None)
+        clients.override("resume_extraction_pool", None)
+        pool.close()
+
+
+@pytest.fixture
+def api():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    # No lifespan: it would close the process-wide clients other tests share
+    return TestClient(app)
+
+
+def post_batch(api, paths):
+    handles = [open(path, "rb") for path in paths]
+    try:
+        response = api.post(
+            "/gemini/summarize_resumes",
+            params={"bypass_cache": True},
+            files=[("files", (path.name, handle, "application/pdf")) for path, handle in zip(paths, handles)],
+        )
+    finally:
+        for handle in handles:
+            handle.close()
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return {line["filename"]: line for line in map(json.loads, response.text.splitlines())}
+
+
+def test_each_file_gets_its_own_line(gemini, api, tmp_path):
+    from app.clients import clients
+    from app.uploads import UPLOAD_MAX_PAGES
+
+    clients.override("resume_chain", StubChain())
+    files = {name: tmp_path / name for name in ("jane.pdf", "notes.txt", "long.pdf", "corrupt.pdf", "unparseable.pdf")}
+    write_pdf(files["jane.pdf"])
+    files["notes.txt"].write_text("not a resume")
+    write_pdf(files["long.pdf"], pages=UPLOAD_MAX_PAGES + 1)
+    files["corrupt.pdf"].write_bytes(b"this is not a PDF")
+    write_pdf(files["unparseable.pdf"], text="Unparseable Resume")
+
+    lines = post_batch(api, list(files.values()))
+
+    assert set(lines) == set(files)
+    assert lines["jane.pdf"]["status"] == "ok" and lines["jane.pdf"]["summary"] == {"firstName": "Jane"}
+    assert {name: (line["status"], line["status_code"]) for name, line in lines.items() if name != "jane.pdf"} == {
+        "notes.txt": ("error", 400),
+        "long.pdf": ("error", 413),
+        "corrupt.pdf": ("error", 400),
+        "unparseable.pdf": ("error", 500),
+    }
+    assert lines["corrupt.pdf"]["error"].startswith("Error reading PDF:")
+
+    # The single-file endpoint reads and rejects the same file the same way
+    with open(files["long.pdf"], "rb") as pdf:
+        single = api.post("/gemini/summarize_resume", files={"file": ("long.pdf", pdf, "application/pdf")})
+    assert (single.status_code, single.json()["detail"]) == (413, lines["long.pdf"]["error"])
+
+
+def test_gemini_calls_are_bounded_by_gemini_concurrency(gemini, api, tmp_path):
+    from app.clients import clients
+
+    chain = StubChain(delay=0.3)
+    clients.override("resume_chain", chain)
+    paths = []
+    for index in range(6):
+        path = tmp_path / f"resume{index}.pdf"
+        write_pdf(path, text=f"Candidate{index} Resume")
+        paths.append(path)
+
+    lines = post_batch(api, paths)
+
+    assert [lines[path.name]["summary"] for path in paths] == [{"firstName": f"Candidate{index}"} for index in range(6)]
+    # The monkeypatched semaphore stands in for GEMINI_CONCURRENCY=2
+    assert chain.peak == 2
@@ -0,0 +1,110 @@
+"""
+Peak server RSS while large PDFs are uploaded concurrently.
+
+The app runs under uvicorn in a subprocess with the Gemini extraction chain
+stubbed, so the measurement covers only the upload path: multipart parsing,
+size checks, hashing and page-by-page text extraction. Linux only, since it
+reads the server's VmHWM (peak RSS) from /proc.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pdf_files import write_pdf
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("pypdf")
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads peak RSS from /proc")
+
+UPLOAD_BYTES = 16 * 1024 * 1024
+CONCURRENT_UPLOADS = 4
+
+SERVER = """
+import sys, uvicorn
+from app.clients import clients
+
+class StubChain:
+    def invoke(self, inputs):
+        return {"firstName": inputs["text"].split()[0]}
+
+clients.override("resume_chain", StubChain())
+from app.main import app
+uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[1]), log_level="warning")
+"""
+
+
+def peak_rss(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("VmHWM not reported")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def server(tmp_path):
+    port = free_port()
+    env = dict(os.environ, RESUME_CACHE_PATH=str(tmp_path / "summaries.sqlite3"), UPLOAD_SPOOL_THRESHOLD=str(1024 * 1024))
+    process = subprocess.Popen([sys.executable, "-c", SERVER, str(port)], env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(200):
+            try:
+                httpx.get(base_url + "/")
+                break
+            except httpx.TransportError:
+                time.sleep(0.05)
+        else:
+            pytest.fail("server did not start")
+        yield process, base_url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def upload(base_url: str, path) -> httpx.Response:
+    with open(path, "rb") as pdf:
+        return httpx.post(
+            base_url + "/gemini/summarize_resume",
+            params={"bypass_cache": True},
+            files={"file": (os.path.basename(path), pdf, "application/pdf")},
+            timeout=120,
+        )
+
+
+def test_concurrent_large_uploads_keep_peak_rss_bounded(server, tmp_path):
+    process, base_url = server
+    small, large = tmp_path / "small.pdf", tmp_path / "large.pdf"
+    write_pdf(small, 1024)
+    write_pdf(large, UPLOAD_BYTES)
+
+    # Warm up: imports, the PDF parser and the cache store are loaded on first use
+    assert upload(base_url, small).json() == {"firstName": "Jane"}
+    baseline = peak_rss(process.pid)
+
+    with ThreadPoolExecutor(CONCURRENT_UPLOADS) as pool:
+        responses = list(pool.map(lambda _: upload(base_url, large), range(CONCURRENT_UPLOADS)))
+    assert [response.status_code for response in responses] == [200] * CONCURRENT_UPLOADS
+
+    growth = peak_rss(process.pid) - baseline
+    print(f"peak RSS growth {growth / 2**20:.1f} MiB for {CONCURRENT_UPLOADS} x {UPLOAD_BYTES / 2**20:.0f} MiB uploads")
+    # Holding the uploads in memory would cost at least CONCURRENT_UPLOADS * UPLOAD_BYTES
+    assert growth < UPLOAD_BYTES
+
+
+def test_oversized_upload_is_rejected(server, tmp_path):
+    _, base_url = server
+    too_large = tmp_path / "too_large.pdf"
+    write_pdf(too_large, 21 * 1024 * 1024)
+    assert upload(base_url, too_large).status_code == 413
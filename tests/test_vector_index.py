@@ -0,0 +1,114 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from app.vector_index import LocalVectorIndex
+
+mongomock = pytest.importorskip("mongomock")
+
+VECTORS = {
+    "east": [1.0, 0.0, 0.0],
+    "north_east": [0.8, 0.6, 0.0],
+    "north": [0.0, 1.0, 0.0],
+    "up": [0.0, 0.0, 1.0],
+    "west": [-1.0, 0.0, 0.0],
+}
+
+
+@pytest.fixture
+def collection():
+    collection = mongomock.MongoClient()["capybara_db"]["resumes"]
+    collection.insert_many([
+        {"_id": name, "text": name, "metadata": {}, "embedding_array": vector}
+        for name, vector in VECTORS.items()
+    ])
+    return collection
+
+
+def cosine(a, b) -> float:
+    a, b = np.asarray(a), np.asarray(b)
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def test_top_k_is_exact_cosine_order(collection, tmp_path):
+    index = LocalVectorIndex(collection, str(tmp_path))
+    assert index.refresh() == len(VECTORS)
+    query = [0.9, 0.3, 0.1]
+
+    results = index.search(query, limit=3)
+
+    expected = sorted(VECTORS, key=lambda name: -cosine(VECTORS[name], query))[:3]
+    assert [doc["_id"] for doc in results] == expected
+    assert [doc["score"] for doc in results] == pytest.approx([cosine(VECTORS[name], query) for name in expected])
+
+
+def test_scores_ignore_vector_length(collection, tmp_path):
+    collection.update_one({"_id": "north_east"}, {"$set": {"embedding_array": [80.0, 60.0, 0.0]}})
+    index = LocalVectorIndex(collection, str(tmp_path))
+    index.refresh()
+
+    results = {doc["_id"]: doc["score"] for doc in index.search([10.0, 0.0, 0.0], limit=5)}
+
+    assert results["north_east"] == pytest.approx(0.8)
+    assert results["east"] == pytest.approx(1.0)
+    assert results["west"] == pytest.approx(-1.0)
+
+
+def test_limit_above_size_returns_everything_in_order(collection, tmp_path):
+    index = LocalVectorIndex(collection, str(tmp_path))
+    index.refresh()
+
+    results = index.search([1.0, 0.0, 0.0], limit=50)
+
+    assert len(results) == len(VECTORS)
+    assert [doc["score"] for doc in results] == sorted((doc["score"] for doc in results), reverse=True)
+
+
+def test_empty_collection_gives_empty_results(tmp_path):
+    index = LocalVectorIndex(mongomock.MongoClient()["capybara_db"]["resumes"], str(tmp_path))
+    assert index.refresh() == 0
+    assert index.search([1.0, 0.0, 0.0]) == []
+    assert len(index) == 0
+
+
+def test_missing_snapshot_is_not_built_on_search(collection, tmp_path):
+    directory = tmp_path / "index"
+    index = LocalVectorIndex(collection, str(directory))
+
+    assert index.search([1.0, 0.0, 0.0]) == []
+    assert not index.exists() and not directory.exists()
+
+
+def test_other_workers_reload_when_the_snapshot_changes(collection, tmp_path):
+    writer = LocalVectorIndex(collection, str(tmp_path))
+    reader = LocalVectorIndex(collection, str(tmp_path))
+    writer.refresh()
+    assert reader.search([0.0, 0.0, 1.0], limit=1)[0]["_id"] == "up"
+
+    collection.insert_one({"_id": "down", "text": "down", "metadata": {}, "embedding_array": [0.0, 0.0, -1.0]})
+    writer.refresh()
+
+    assert reader.search([0.0, 0.0, -1.0], limit=1)[0]["_id"] == "down"
+    assert len(reader) == len(VECTORS) + 1
+
+
+def test_concurrent_refreshes_leave_a_matching_pair(collection, tmp_path):
+    indexes = [LocalVectorIndex(collection, str(tmp_path)) for _ in range(4)]
+
+    def refresh_and_grow(index, worker):
+        for step in range(5):
+            collection.insert_one({"text": f"{worker}-{step}", "metadata": {}, "embedding_array": [0.5, 0.5, 0.5]})
+            index.refresh()
+
+    threads = [threading.Thread(target=refresh_and_grow, args=(index, worker)) for worker, index in enumerate(indexes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reader = LocalVectorIndex(collection, str(tmp_path))
+    assert len(reader) == len(reader._matrix)
+    # Every temporary pointer was renamed into place
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]